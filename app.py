@@ -2,25 +2,17 @@ import streamlit as st
 import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
-from models.llm import get_gemini_llm
-from models.embeddings import get_gemini_embeddings
-from utils.rag_pipeline import ingest_pdfs, answer_query_with_rag, find_doctor_suggestions
 from utils.booking_flow import BookingFlow
-from db.supabase_client import get_all_bookings, create_user, authenticate_user
-from tools.email_tool import send_booking_email
+from db.supabase_client import get_bookings_page, count_bookings, create_user, authenticate_user
+from tools.email_outbox import enqueue_booking_email
+from utils.tracing import trace
+from utils.warmup import warm_up_if_enabled
+from utils.intent_router import get_intent_router, BOOKING, DOCTOR_SEARCH, YES
 from streamlit_option_menu import option_menu
 
-def is_booking_intent(message: str) -> bool:
-    booking_keywords = [
-        "book", "appointment", "reserve", "reservation", "register", "schedule", "meeting", "slot"
-    ]
-    return any(word in message.lower() for word in booking_keywords)
-
-def is_doctor_search_intent(message: str) -> bool:
-    doctor_keywords = ["doctor", "physician", "specialist", "find", "suggest", "recommend", "search"]
-    return any(word in message.lower() for word in doctor_keywords)
-
 def show_chat_page():
+    # the RAG stack is imported here so the login and admin pages don't load it
+    from utils.rag_pipeline import ingest_pdfs, stream_answer_query_with_rag, find_doctor_suggestions, list_indexed_documents, remove_document
     st.markdown("<h1 class='main-header'>🤖 AI Booking Assistant</h1>", unsafe_allow_html=True)
     
     if "booking_flow" not in st.session_state or not isinstance(st.session_state.booking_flow, BookingFlow):
@@ -32,10 +24,25 @@ def show_chat_page():
         uploaded_files = st.file_uploader("Upload PDFs", type="pdf", accept_multiple_files=True, key="chat_pdf")
         if uploaded_files:
             try:
-                ingest_pdfs(uploaded_files)
-                st.success("PDFs processed for this session.")
+                # append mode: files already indexed (e.g. on every rerun) are skipped
+                progress_bar = st.progress(0.0, text="Processing PDFs...")
+                summary = ingest_pdfs(
+                    uploaded_files, mode="append",
+                    progress=lambda done, total: progress_bar.progress(done / total, text=f"Processed {done}/{total} pages"),
+                )
+                progress_bar.empty()
+                if summary["documents_added"]:
+                    st.success(f"Indexed {summary['documents_added']} PDF(s), {summary['chunks_added']} new chunks.")
+                else:
+                    st.success("PDFs already indexed.")
             except Exception as e:
                 st.error(f"Failed to process PDFs: {e}")
+        for doc in list_indexed_documents():
+            col1, col2 = st.columns([4, 1])
+            col1.markdown(f"📄 {doc['name']} ({doc['chunks']} chunks)")
+            if col2.button("Remove", key=f"remove_{doc['doc_id']}"):
+                remove_document(doc["doc_id"])
+                st.rerun()
 
     # display previous messages
     if "messages" not in st.session_state:
@@ -55,8 +62,11 @@ def show_chat_page():
             with st.chat_message("user"):
                 st.markdown(prompt)
 
+        # greetings, thanks, yes/no and FAQ hits are answered locally; only real questions reach the LLM
+        route = None if booking_flow.active else get_intent_router().route(prompt)
+
         # If booking intent detected and not already in booking flow, ask for confirmation
-        if is_booking_intent(prompt) and not booking_flow.active and not st.session_state.get("booking_intent_asked"):
+        if route is not None and route.intent == BOOKING and not st.session_state.get("booking_intent_asked"):
             with chat_container:
                 with st.chat_message("assistant"):
                     st.markdown("Do you want to book an appointment? (yes/no)")
@@ -65,7 +75,7 @@ def show_chat_page():
             st.rerun()
 
         # If user replies "yes" to booking intent, start booking flow
-        if prompt.strip().lower() in ["yes", "y"] and st.session_state.get("booking_intent_asked") and not booking_flow.active:
+        if route is not None and route.intent in (YES, BOOKING) and st.session_state.get("booking_intent_asked"):
             # Check if we have a suggested doctor to prefill
             doctor_info = st.session_state.get("last_suggested_doctor")
             booking_flow.start_booking(doctor_info=doctor_info)
@@ -77,6 +87,8 @@ def show_chat_page():
                     st.markdown(resp)
             st.session_state.messages.append({"role": "assistant", "content": resp})
             st.rerun()
+        # any other reply declines the booking offer and is handled as a normal turn
+        st.session_state.booking_intent_asked = False
 
         # If booking flow active, route input to booking flow (no RAG)
         if booking_flow.active:
@@ -94,10 +106,11 @@ def show_chat_page():
                     booking_flow.reset()
                     st.session_state.messages = []
                     st.rerun()
-                email_sent = send_booking_email(data["email"], booking_id, data)
-                if email_sent:
+                # delivery and retries happen on the outbox worker, not in this rerun
+                try:
+                    enqueue_booking_email(data["email"], booking_id)
                     st.success(f"Thank you! Your booking is confirmed and will be sent to your email. Booking ID: {booking_id}")
-                else:
+                except Exception:
                     st.warning(f"Booking saved, but email could not be sent. Booking ID: {booking_id}")
                 st.session_state.booking_flow = BookingFlow()
                 st.session_state.messages = []
@@ -108,21 +121,31 @@ def show_chat_page():
                 st.rerun()
 
         # Only run general Q&A when booking flow is NOT active
-        if not booking_flow.active and not st.session_state.get("booking_intent_asked"):
+        if route is not None and not booking_flow.active:
+            if route.reply is not None:
+                answer = route.reply
+                with chat_container:
+                    with st.chat_message("assistant"):
+                        st.markdown(answer)
             # Check if it's a doctor search
-            if is_doctor_search_intent(prompt):
-                doctors = find_doctor_suggestions(prompt)
+            elif route.intent == DOCTOR_SEARCH:
+                doctors = find_doctor_suggestions(route.text)
                 if doctors:
                     st.session_state.last_suggested_doctor = doctors[0]
+                    # a plain "yes" to this question starts the booking flow
+                    st.session_state.booking_intent_asked = True
                     answer = f"I found some doctors for you. Here is the best match: **{doctors[0].get('name')}** ({doctors[0].get('specialization')}). Would you like to book an appointment with them?"
                 else:
                     answer = "I couldn't find any doctors matching your request in the documents."
+                with chat_container:
+                    with st.chat_message("assistant"):
+                        st.markdown(answer)
             else:
-                answer = answer_query_with_rag(prompt)
-            
-            with chat_container:
-                with st.chat_message("assistant"):
-                    st.markdown(answer or "Not found in documents.")
+                # render tokens as they arrive so the first words show up immediately
+                with chat_container:
+                    with st.chat_message("assistant"):
+                        with trace("rag.answer_stream"):
+                            answer = st.write_stream(stream_answer_query_with_rag(route.text))
             st.session_state.messages.append({"role": "assistant", "content": answer})
 
 def show_login_page():
@@ -143,20 +166,84 @@ def show_login_page():
                 else:
                     st.error("Invalid credentials")
 
+ADMIN_PAGE_SIZE = 50
+ADMIN_CACHE_TTL = int(os.getenv("ADMIN_CACHE_TTL", "30"))
+
+# short-lived caches so reruns and page flips don't hit the database again
+@st.cache_data(ttl=ADMIN_CACHE_TTL, show_spinner=False)
+def _cached_bookings_page(limit, after_id, date_from, date_to, doctor, status):
+    return get_bookings_page(limit, after_id, date_from, date_to, doctor, status)
+
+@st.cache_data(ttl=ADMIN_CACHE_TTL, show_spinner=False)
+def _cached_booking_counts(group_by, date_from, date_to, doctor, status):
+    return count_bookings(group_by, date_from, date_to, doctor, status)
+
 def show_admin_page():
     if not st.session_state.user or not st.session_state.user.get("is_admin"):
         st.error("Admin access required.")
         return
 
     st.markdown("<h1 class='main-header'>Admin Dashboard - Bookings</h1>", unsafe_allow_html=True)
-    bookings = get_all_bookings()
+
+    doctors = sorted(k for k in _cached_booking_counts("doctor", None, None, None, None) if k)
+    statuses = sorted(k for k in _cached_booking_counts("status", None, None, None, None) if k)
+    col1, col2, col3, col4 = st.columns(4)
+    date_from = col1.date_input("From", value=None)
+    date_to = col2.date_input("To", value=None)
+    doctor = col3.selectbox("Doctor", ["All"] + doctors)
+    status = col4.selectbox("Status", ["All"] + statuses)
+    filters = (
+        date_from.isoformat() if date_from else None,
+        date_to.isoformat() if date_to else None,
+        None if doctor == "All" else doctor,
+        None if status == "All" else status,
+    )
+
+    # cursor stack for keyset pagination; a filter change starts again at page one
+    if st.session_state.get("admin_filters") != filters:
+        st.session_state.admin_filters = filters
+        st.session_state.admin_cursors = [None]
+    cursors = st.session_state.admin_cursors
+
+    per_day = _cached_booking_counts("day", *filters)
+    per_doctor = _cached_booking_counts("doctor", *filters)
+    st.metric("Bookings", sum(per_day.values()))
+    chart1, chart2 = st.columns(2)
+    if per_day:
+        chart1.caption("Bookings per day")
+        chart1.bar_chart({str(k): v for k, v in per_day.items()})
+    if per_doctor:
+        chart2.caption("Bookings per doctor")
+        chart2.bar_chart({str(k): v for k, v in per_doctor.items()})
+
+    bookings, next_cursor = _cached_bookings_page(ADMIN_PAGE_SIZE, cursors[-1], *filters)
     if bookings:
         st.dataframe(bookings, use_container_width=True)
     else:
         st.info("No bookings found.")
 
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    if prev_col.button("Previous", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    page_col.caption(f"Page {len(cursors)}")
+    if next_col.button("Next", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
+
+    with st.expander("Chat routing"):
+        stats = get_intent_router().stats()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Chat turns", stats["total"])
+        col2.metric("Sent to LLM", stats["routed_to_llm"])
+        col3.metric("LLM calls saved", stats["llm_calls_saved"])
+        if stats["by_intent"]:
+            st.bar_chart(stats["by_intent"])
+
 def main():
     st.set_page_config(page_title="AI Booking Assistant", page_icon="🤖", layout="wide")
+    # no-op unless WARMUP_ON_START=1; starts at most one background thread per process
+    warm_up_if_enabled()
 
     # Custom CSS for a premium look
     st.markdown("""
@@ -0,0 +1,79 @@
+# benchmarks/bench_appointments.py
+"""
+Latency of availability checks, booking and cancellation as the appointment store grows,
+then memory per appointment, doctor/date range scans and snapshot save/load for the
+object store vs the columnar AppointmentTable.
+Run from the repo root: python -m benchmarks.bench_appointments [--sizes 1000 10000 100000 1000000]
+"""
+import os
+import time
+import argparse
+import tempfile
+import tracemalloc
+from models.booking import Appointment, slot_to_minute
+from utils.appointment_table import AppointmentTable
+from utils.booking_utils import AppointmentStore
+
+def _slot(i: int) -> str:
+    day, hour = divmod(i, 10)
+    return f"2026-{1 + day // 28 % 12:02d}-{1 + day % 28:02d} {8 + hour:02d}:00"
+
+def _per_op_us(fn, ops: int) -> float:
+    start = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    return (time.perf_counter() - start) / ops * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--ops", type=int, default=20_000)
+    parser.add_argument("--doctors", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'appointments':>12} {'is_booked us':>13} {'book us':>9} {'cancel us':>10}")
+    for size in args.sizes:
+        store = AppointmentStore()
+        for i in range(size):
+            store.book(Appointment(f"patient{i}", f"Dr. {i % args.doctors}", _slot(i // args.doctors), "p@example.com"))
+        # probe doctors beyond the prefilled range so book/cancel never collide with existing slots
+        fresh = [Appointment(f"new{i}", f"Dr. new{i % 97}", _slot(i), "n@example.com") for i in range(args.ops)]
+        check = _per_op_us(lambda i: store.is_booked(f"Dr. {i % args.doctors}", _slot(i)), args.ops)
+        book = _per_op_us(lambda i: store.book(fresh[i]), args.ops)
+        cancel = _per_op_us(lambda i: store.cancel(fresh[i].patient_name, fresh[i].doctor_name, fresh[i].slot), args.ops)
+        print(f"{size:>12} {check:>13.2f} {book:>9.2f} {cancel:>10.2f}")
+
+    print(f"\n{'appointments':>12} {'store B/appt':>13} {'table B/appt':>13} {'store range ms':>15} "
+          f"{'table range ms':>15} {'save ms':>8} {'load ms':>8}")
+    for size in args.sizes:
+        # names are built before tracing so both layouts are charged only for their own storage
+        rows = [(f"patient{i}", f"Dr. {i % args.doctors}", slot_to_minute(_slot(i // args.doctors)), "p@example.com")
+                for i in range(size)]
+        tracemalloc.start()
+        store = AppointmentStore()
+        for row in rows:
+            store.book(Appointment(*row))
+        store_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        table = AppointmentTable.from_appointments(Appointment(*row) for row in rows)
+        table_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        # one doctor over the middle half of the schedule
+        lo, hi = rows[size // 4][2], rows[3 * size // 4][2]
+        store_range = _per_op_us(lambda i: store.in_range(f"Dr. {i % args.doctors}", lo, hi), 50) / 1000
+        table_range = _per_op_us(lambda i: table.scan(f"Dr. {i % args.doctors}", lo, hi), 50) / 1000
+        path = os.path.join(tempfile.mkdtemp(prefix="appt-bench-"), "appointments.npz")
+        start = time.perf_counter()
+        table.save(path)
+        save_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        AppointmentTable.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        os.remove(path)
+        print(f"{size:>12} {store_bytes / size:>13.0f} {table_bytes / size:>13.0f} {store_range:>15.3f} "
+              f"{table_range:>15.3f} {save_ms:>8.1f} {load_ms:>8.1f}")
+
+if __name__ == "__main__":
+    main()
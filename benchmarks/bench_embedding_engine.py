@@ -0,0 +1,31 @@
+# benchmarks/bench_embedding_engine.py
+"""
+Offline benchmark for the batched embedding engine using the local FakeEmbeddings.
+Run from the repo root: python -m benchmarks.bench_embedding_engine
+"""
+import time
+import argparse
+from models.embeddings import FakeEmbeddings
+from utils.embedding_engine import EmbeddingEngine
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per embed call")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="simulate a 429 on every Nth call")
+    args = parser.parse_args()
+
+    texts = [f"chunk {i} " * 20 for i in range(args.chunks)]
+    for batch_size, workers in [(args.chunks, 1), (64, 1), (64, 4), (64, 8), (32, 8)]:
+        fake = FakeEmbeddings(size=256, latency=args.latency, rate_limit_every=args.rate_limit_every)
+        engine = EmbeddingEngine(fake, batch_size=batch_size, max_workers=workers, base_delay=0.05)
+        start = time.perf_counter()
+        engine.embed(texts)
+        elapsed = time.perf_counter() - start
+        print(
+            f"batch={batch_size:<5} workers={workers:<2} {elapsed:7.3f}s "
+            f"{args.chunks / elapsed:9.1f} chunks/s retries={engine.retries} final_limit={engine.limiter.limit}"
+        )
+
+if __name__ == "__main__":
+    main()
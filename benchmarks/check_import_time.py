@@ -0,0 +1,102 @@
+# benchmarks/check_import_time.py
+"""
+Cold-start guard: imports each entry point in a fresh interpreter under -X importtime,
+fails if it exceeds its time budget or pulls in a heavy module that should load lazily.
+Run from the repo root: python -m benchmarks.check_import_time [--runs 5] [--json]
+Exit status is 1 on any regression, so it can gate CI.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+from statistics import median
+from typing import Dict, List
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# module -> (budget in ms, modules that must not be imported by it)
+TARGETS = {
+    "routes.booking_api": (600, ["faiss", "langchain_community", "langchain_google_genai", "langchain_groq",
+                                 "langchain_text_splitters", "PyPDF2", "supabase", "requests", "httpx"]),
+    "app": (1200, ["faiss", "langchain_community", "langchain_google_genai", "langchain_groq", "PyPDF2", "supabase"]),
+    "utils.rag_pipeline": (1500, ["langchain_google_genai", "langchain_groq", "PyPDF2", "supabase"]),
+}
+
+_PROBE = (
+    "import sys, json; import {module}; "
+    "print(json.dumps(sorted(m for m in {forbidden!r} if m in sys.modules)))"
+)
+
+def _run_once(module: str, forbidden: List[str]):
+    env = dict(os.environ)
+    # a cold worker shouldn't need credentials just to import
+    for key in ("SUPABASE_URL", "SUPABASE_ANON_KEY", "GEMINI_API_KEY"):
+        env.pop(key, None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, forbidden=forbidden)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+    self_us = {}
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = [f.strip() for f in line[len("import time:"):].split("|")]
+        if len(fields) != 3 or not fields[0].isdigit():
+            continue  # column header
+        self_part, cumulative, name = fields
+        self_us[name] = int(self_part)
+        if name == module:
+            total_us = int(cumulative)
+    leaked = json.loads(proc.stdout.strip().splitlines()[-1])
+    return total_us / 1000, self_us, leaked
+
+def measure_import(module: str, forbidden: List[str] = (), runs: int = 3) -> Dict:
+    """Median cold import time of ``module`` over ``runs`` fresh interpreters, plus the slowest modules."""
+    times, leaked, slowest = [], [], {}
+    for _ in range(runs):
+        ms, self_us, leaked = _run_once(module, list(forbidden))
+        times.append(ms)
+        slowest = self_us
+    top = sorted(slowest.items(), key=lambda kv: -kv[1])[:10]
+    return {
+        "median_ms": median(times),
+        "min_ms": min(times),
+        "runs": runs,
+        "leaked_modules": leaked,
+        "slowest_self_ms": {name: us / 1000 for name, us in top},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget, e.g. for slow CI machines")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report, failures = {}, []
+    for module, (budget_ms, forbidden) in TARGETS.items():
+        result = measure_import(module, forbidden, args.runs)
+        result["budget_ms"] = budget_ms * args.scale
+        report[module] = result
+        if result["median_ms"] > result["budget_ms"]:
+            failures.append(f"{module}: {result['median_ms']:.0f}ms exceeds budget {result['budget_ms']:.0f}ms")
+        if result["leaked_modules"]:
+            failures.append(f"{module}: imports {', '.join(result['leaked_modules'])} eagerly")
+
+    if args.json:
+        print(json.dumps({"results": report, "failures": failures}, indent=2))
+    else:
+        for module, result in report.items():
+            print(f"{module:<22} {result['median_ms']:8.1f}ms  (budget {result['budget_ms']:.0f}ms)")
+            for name, ms in list(result["slowest_self_ms"].items())[:5]:
+                print(f"    {ms:8.1f}ms  {name}")
+        for failure in failures:
+            print("FAIL", failure)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
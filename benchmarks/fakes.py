@@ -0,0 +1,385 @@
+# benchmarks/fakes.py
+"""
+Deterministic local stand-ins for Gemini, Supabase and the email service, with
+injectable latency, so the benchmarks run offline and give repeatable numbers.
+
+install() swaps the fakes into the lazily created clients, so it should run before
+the first request reaches Gemini, Supabase or the email service.
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+from itertools import count
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+class Latency:
+    """Seconds of simulated network time per call to each external service."""
+    def __init__(self, embed: float = 0.0, llm: float = 0.0, db: float = 0.0, email: float = 0.0):
+        self.embed = embed
+        self.llm = llm
+        self.db = db
+        self.email = email
+
+    def as_dict(self) -> Dict[str, float]:
+        return {"embed": self.embed, "llm": self.llm, "db": self.db, "email": self.email}
+
+# --- LLM -------------------------------------------------------------------
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+class FakeLLM:
+    """
+    Answers like the chat model in shape: doctor prompts get a JSON array of the
+    doctors named in the context, everything else a short extractive answer.
+    """
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def _answer(self, prompt) -> str:
+        self.calls += 1
+        prompt = str(prompt)
+        if "Return JSON array" in prompt:
+            names = list(dict.fromkeys(re.findall(r"Dr\.\s+[A-Z]\w+(?:\s+[A-Z]\w+)?", prompt)))[:3]
+            return json.dumps([
+                {"name": name, "specialization": "", "experience_years": "", "fee": "", "available_times": ["09:00"]}
+                for name in names
+            ])
+        context = prompt.split("Context:", 1)[-1]
+        sentence = next((s.strip() for s in re.split(r"[.\n]", context) if len(s.strip()) > 20), "")
+        return sentence or "I don't know based on the provided documents."
+
+    def invoke(self, prompt):
+        if self.latency:
+            time.sleep(self.latency)
+        return FakeMessage(self._answer(prompt))
+
+    async def ainvoke(self, prompt):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return FakeMessage(self._answer(prompt))
+
+    def stream(self, prompt):
+        answer = self.invoke(prompt).content
+        for start in range(0, len(answer), 16):
+            yield FakeMessage(answer[start:start + 16])
+
+# --- Supabase --------------------------------------------------------------
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+class FakeDatabase:
+    """In-memory tables shared by the sync and async fake clients."""
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables: Dict[str, List[dict]] = {"customers": [], "bookings": [], "users": []}
+        self.ids = {name: count(1) for name in self.tables}
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def upsert(self, table: str, rows: List[dict], key: str) -> List[dict]:
+        out = []
+        for row in rows:
+            existing = next((r for r in self.tables[table] if r.get(key) == row.get(key)), None)
+            if existing is None:
+                out.extend(self.insert(table, [row]))
+            else:
+                existing.update(row)
+                out.append(dict(existing))
+        return out
+
+    def insert(self, table: str, rows: List[dict]) -> List[dict]:
+        out = []
+        pk = "customer_id" if table == "customers" else "id"
+        for row in rows:
+            row = dict(row)
+            if table != "users":
+                row[pk] = next(self.ids[table])
+            if table == "bookings":
+                row.setdefault("created_at", time.strftime("%Y-%m-%dT%H:%M:%S"))
+            self.tables[table].append(row)
+            out.append(dict(row))
+        return out
+
+    def rpc(self, name: str, params: dict):
+        if name == "book_with_customer":
+            customer = self.upsert("customers", [{"name": params["p_name"], "email": params["p_email"], "phone": params["p_phone"]}], "email")[0]
+            booking = self.insert("bookings", [{
+                "customer_id": customer["customer_id"], "booking_type": params["p_booking_type"],
+                "date": params["p_date"], "time": params["p_time"], "status": "confirmed",
+                "doctor_name": params["p_doctor_name"],
+            }])[0]
+            return booking["id"]
+        if name == "bulk_book_with_customers":
+            ids = []
+            for row in params["p_rows"]:
+                ids.append({"id": self.rpc("book_with_customer", {f"p_{k}": v for k, v in row.items()})})
+            return ids
+        if name == "booking_counts":
+            column = {"doctor": "doctor_name", "status": "status"}.get(params["p_group"], "date")
+            counts = {}
+            for row in self.tables["bookings"]:
+                if params.get("p_date_from") and str(row.get("date")) < params["p_date_from"]:
+                    continue
+                if params.get("p_date_to") and str(row.get("date")) > params["p_date_to"]:
+                    continue
+                if params.get("p_doctor") and row.get("doctor_name") != params["p_doctor"]:
+                    continue
+                if params.get("p_status") and row.get("status") != params["p_status"]:
+                    continue
+                counts[row.get(column)] = counts.get(row.get(column), 0) + 1
+            return [{"key": k, "count": v} for k, v in sorted(counts.items(), key=lambda kv: str(kv[0]))]
+        from postgrest.exceptions import APIError
+        raise APIError({"code": "PGRST202", "message": f"Could not find the function public.{name}"})
+
+class FakeQuery:
+    """The subset of the postgrest query builder the app uses."""
+    _OPS = {
+        "eq": lambda a, b: a == b, "gt": lambda a, b: a > b, "gte": lambda a, b: a >= b,
+        "lt": lambda a, b: a < b, "lte": lambda a, b: a <= b, "in_": lambda a, b: a in b,
+    }
+
+    def __init__(self, db: FakeDatabase, table: str):
+        self.db = db
+        self.table = table
+        self.action = "select"
+        self.columns = None
+        self.rows = None
+        self.on_conflict = None
+        self.filters = []
+        self.order_by = None
+        self.limit_n = None
+        self.single_row = False
+        self.rpc_call = None
+
+    def select(self, columns="*"):
+        self.columns = None if columns == "*" else [c.strip() for c in columns.split(",")]
+        return self
+
+    def insert(self, rows):
+        self.action, self.rows = "insert", rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.action, self.rows, self.on_conflict = "upsert", rows if isinstance(rows, list) else [rows], on_conflict
+        return self
+
+    def __getattr__(self, name):
+        if name not in self._OPS:
+            raise AttributeError(name)
+        def add_filter(column, value):
+            self.filters.append((column, self._OPS[name], value))
+            return self
+        return add_filter
+
+    def order(self, column, desc=False):
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    def _run(self):
+        db = self.db
+        with db.lock:
+            db.requests += 1
+            if self.rpc_call:
+                return FakeResponse(db.rpc(*self.rpc_call))
+            if self.action == "insert":
+                return FakeResponse(db.insert(self.table, self.rows))
+            if self.action == "upsert":
+                return FakeResponse(db.upsert(self.table, self.rows, self.on_conflict or "id"))
+            rows = [r for r in db.tables[self.table]
+                    if all(op(str(r.get(c)) if isinstance(v, str) else r.get(c), v) for c, op, v in self.filters)]
+        if self.order_by:
+            column, desc = self.order_by
+            rows.sort(key=lambda r: r.get(column), reverse=desc)
+        if self.limit_n is not None:
+            rows = rows[:self.limit_n]
+        if self.columns:
+            rows = [{c: r.get(c) for c in self.columns} for r in rows]
+        else:
+            rows = [dict(r) for r in rows]
+        if self.single_row:
+            if len(rows) != 1:
+                raise RuntimeError("JSON object requested, multiple (or no) rows returned")
+            return FakeResponse(rows[0])
+        return FakeResponse(rows)
+
+    def execute(self):
+        if self.db.latency:
+            time.sleep(self.db.latency)
+        return self._run()
+
+class AsyncFakeQuery(FakeQuery):
+    async def execute(self):
+        if self.db.latency:
+            await asyncio.sleep(self.db.latency)
+        return self._run()
+
+class FakeSupabase:
+    def __init__(self, db: FakeDatabase, query_cls=FakeQuery):
+        self.db = db
+        self._query_cls = query_cls
+
+    def table(self, name):
+        return self._query_cls(self.db, name)
+
+    def rpc(self, name, params):
+        query = self._query_cls(self.db, None)
+        query.rpc_call = (name, params)
+        return query
+
+# --- email service ---------------------------------------------------------
+
+class FakeEmailService:
+    """Local HTTP server that accepts booking-confirmation POSTs after ``latency`` seconds."""
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.received = 0
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if service.latency:
+                    time.sleep(service.latency)
+                service.received += 1
+                body = b'{"success": true}'
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/booking-confirmation"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+# --- synthetic documents ---------------------------------------------------
+
+SPECIALIZATIONS = ["General Physician", "Dermatologist", "Orthopedic Specialist", "Cardiologist", "Pediatrician"]
+_WORDS = ("clinic patient care consultation diagnosis treatment therapy insurance billing pharmacy "
+          "laboratory radiology emergency ward appointment policy schedule visit referral nurse").split()
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def make_pdf(pages: List[str]) -> bytes:
+    """Minimal text-only PDF (Helvetica, one line per text line) readable by PyPDF2."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        lines = " T* ".join(f"({_pdf_escape(line)}) Tj" for line in text.splitlines())
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {lines} ET"
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_ref} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+def clinic_pages(doc: int, num_pages: int, doctors_per_page: int = 2, lines_per_page: int = 50) -> List[str]:
+    """Page texts with a few parseable doctor records and varied filler prose."""
+    pages = []
+    for page in range(num_pages):
+        lines = [f"Clinic handbook {doc} - page {page + 1}"]
+        for d in range(doctors_per_page):
+            n = (doc * num_pages + page) * doctors_per_page + d
+            # same lettered layout as the sample clinic document
+            lines += [
+                f"{d + 1}. Dr. Doctor{n} Surname{n % 97}",
+                f"a. Specialization: {SPECIALIZATIONS[n % len(SPECIALIZATIONS)]}",
+                f"b. Experience: {5 + n % 20} years",
+                f"c. Consultation Fee: Rs {400 + 50 * (n % 8)}",
+                f"d. Available: {9 + n % 8}:00",
+            ]
+        for i in range(lines_per_page - len(lines)):
+            seed = doc * 7919 + page * 131 + i
+            lines.append(" ".join(_WORDS[(seed * (k + 3)) % len(_WORDS)] for k in range(12)) + f" ref{seed}.")
+        pages.append("\n".join(lines))
+    return pages
+
+class Upload:
+    """Stands in for a Streamlit UploadedFile: a named, readable byte buffer."""
+    def __init__(self, name: str, data: bytes):
+        import io
+        self.name = name
+        self._buf = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._buf.read(size)
+
+    def seek(self, pos):
+        return self._buf.seek(pos)
+
+# --- wiring ----------------------------------------------------------------
+
+def install(latency: Latency, embedding_size: int = 256):
+    """
+    Point the app's Gemini, Supabase and email dependencies at the fakes above.
+    Returns the fake handles (llm, database, email service) for inspection.
+    """
+    os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+    os.environ.setdefault("SUPABASE_ANON_KEY", "offline.benchmark.key")
+    os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+
+    import models.embeddings as embeddings
+    import models.llm as llm_module
+    import db.supabase_client as supabase_client
+    import tools.email_tool as email_tool
+    import utils.rag_pipeline as rag_pipeline
+
+    fake_embeddings = embeddings.FakeEmbeddings(size=embedding_size, latency=latency.embed)
+    embeddings.get_gemini_embeddings = lambda: fake_embeddings
+    llm = FakeLLM(latency.llm)
+    for module in (llm_module, rag_pipeline):
+        module.get_gemini_llm = lambda: llm
+
+    database = FakeDatabase(latency.db)
+    supabase_client._client = FakeSupabase(database)
+    async_client = FakeSupabase(database, AsyncFakeQuery)
+
+    async def get_async_supabase():
+        return async_client
+    supabase_client.get_async_supabase = get_async_supabase
+
+    email = FakeEmailService(latency.email)
+    email_tool.EMAIL_SERVICE_URL = email.url
+    return llm, database, email
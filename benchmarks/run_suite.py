@@ -0,0 +1,228 @@
+# benchmarks/run_suite.py
+"""
+End-to-end offline benchmark: ingest throughput plus p50/p95/p99 latency of the RAG,
+doctor search, booking flow and API paths, with Gemini, Supabase and the email
+service replaced by the local fakes in benchmarks/fakes.py.
+Run from the repo root: python -m benchmarks.run_suite [--out results.json] [--llm-latency-ms 300]
+Results are JSON so runs from different versions can be diffed or charted.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.check_import_time import TARGETS, measure_import
+from benchmarks.fakes import Latency, Upload, clinic_pages, install, make_pdf
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Nearest-rank percentiles of per-call latencies, reported in milliseconds."""
+    ordered = sorted(samples)
+    n = len(ordered)
+    def rank(p):
+        return ordered[min(n - 1, max(0, int(round(p / 100 * n + 0.5)) - 1))] * 1000
+    return {
+        "n": n,
+        "mean_ms": sum(ordered) / n * 1000,
+        "p50_ms": rank(50),
+        "p95_ms": rank(95),
+        "p99_ms": rank(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+def measure(fn: Callable, inputs: Iterable, warmup: int = 0) -> Dict[str, float]:
+    inputs = list(inputs)
+    for item in inputs[:warmup]:
+        fn(item)
+    samples = []
+    for item in inputs[warmup:]:
+        start = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def bench_ingest(rp, args) -> Dict:
+    docs = [
+        Upload(f"handbook_{d}.pdf", make_pdf(clinic_pages(d, args.pages_per_doc)))
+        for d in range(args.docs)
+    ]
+    results = {}
+    for label, mode in (("cold", "replace"), ("warm_embedding_cache", "replace"), ("unchanged_append", "append")):
+        start = time.perf_counter()
+        summary = rp.ingest_pdfs(docs, mode=mode)
+        elapsed = time.perf_counter() - start
+        # what this run actually processed: an unchanged append skips every document
+        pages = summary["pages"]
+        chunks = summary["chunks_added"] + summary["chunks_reused"]
+        results[label] = {
+            "seconds": elapsed,
+            "pages": pages,
+            "chunks": chunks,
+            "pages_per_s": pages / elapsed if pages else 0.0,
+            "chunks_per_s": chunks / elapsed if chunks else 0.0,
+            "summary": summary,
+        }
+    return results
+
+def bench_rag(rp, args) -> Dict:
+    topics = ["consultation fee", "insurance billing", "radiology referral", "pharmacy hours", "emergency ward"]
+    unique = [f"What is the {topics[i % len(topics)]} policy for ref{i * 37}?" for i in range(args.queries)]
+    repeated = [unique[i % 5] for i in range(args.queries)]
+    return {
+        "answer_query_with_rag": measure(rp.answer_query_with_rag, unique, warmup=2),
+        "answer_query_with_rag_cached": measure(rp.answer_query_with_rag, repeated, warmup=5),
+    }
+
+def bench_doctor_search(rp, args) -> Dict:
+    directory = ["I need a cardiologist", "skin rash doctor", "knee pain specialist", "Dr. Doctor3", "fever and cough"]
+    fallback = [f"who handles referral case ref{i * 53}" for i in range(args.queries)]
+    return {
+        "find_doctor_suggestions_directory": measure(
+            rp.find_doctor_suggestions, [directory[i % len(directory)] for i in range(args.queries)], warmup=2),
+        "find_doctor_suggestions_llm": measure(rp.find_doctor_suggestions, fallback, warmup=2),
+    }
+
+def bench_booking_flow(args) -> Dict:
+    from utils.booking_flow import BookingFlow
+    day = (date.today() + timedelta(days=1)).isoformat()
+    samples = []
+    for i in range(args.conversations):
+        flow = BookingFlow()
+        flow.start_booking({"name": "Dr. Alice Smith"})
+        for message in (f"Patient {i}", f"p{i}@example.com", f"98765{i:05d}", "Doctor Appointment", day, "yes"):
+            start = time.perf_counter()
+            flow.handle_message(message, [])
+            samples.append(time.perf_counter() - start)
+    save = measure(lambda i: BookingFlow().save_booking({
+        "name": f"Patient {i}", "email": f"p{i}@example.com", "phone": "9876543210",
+        "booking_type": "Doctor Appointment", "date": day, "time": "09:00", "doctor_name": "Dr. Alice Smith",
+    }), range(args.conversations))
+    return {"BookingFlow.handle_message": percentiles(samples), "BookingFlow.save_booking": save}
+
+def bench_api(args) -> Dict:
+    from flask import Flask
+    from models.booking import Doctor
+    from routes.booking_api import booking_api
+    from utils.booking_utils import add_doctor
+
+    start_day = date.today() + timedelta(days=1)
+    slots = [
+        f"{(start_day + timedelta(days=i // 32)).isoformat()} {9 + (i % 32) // 4:02d}:{(i % 4) * 15:02d}"
+        for i in range(args.requests)
+    ]
+    add_doctor(Doctor("Dr. Bench Mark", "Cardiology", slots))
+
+    app = Flask(__name__)
+    app.register_blueprint(booking_api)
+    client = app.test_client()
+
+    def call(method, path, **kwargs):
+        resp = client.open(path, method=method, **kwargs)
+        if resp.status_code >= 500:
+            raise RuntimeError(f"{method} {path} -> {resp.status_code}: {resp.get_data(as_text=True)[:200]}")
+        return resp
+
+    def book(i):
+        call("POST", "/book", json={"patient_name": f"p{i}", "doctor_name": "Dr. Bench Mark", "slot": slots[i], "email": "p@example.com"})
+
+    def cancel(i):
+        call("POST", "/cancel", json={"patient_name": f"p{i}", "doctor_name": "Dr. Bench Mark", "slot": slots[i]})
+
+    n = args.requests
+    queries = min(n, args.queries)
+    return {
+        "POST /book": measure(book, range(n)),
+        "GET /availability": measure(lambda i: call("GET", f"/availability?specialization=Cardiology&limit=10&start={start_day}"), range(n)),
+        "POST /cancel": measure(cancel, range(n)),
+        "GET /faq": measure(lambda i: call("GET", "/faq", query_string={"question": ["clinic timings?", "where is the clinic", "parking"][i % 3]}), range(n)),
+        "POST /chat": measure(lambda i: call("POST", "/chat", json={"message": f"What does ref{i * 11} say about billing?"}), range(queries)),
+        "POST /doctors/search": measure(lambda i: call("POST", "/doctors/search", json={"query": ["skin rash", "heart checkup", "ref case"][i % 3]}), range(queries)),
+        "POST /bookings": measure(lambda i: call("POST", "/bookings", json={
+            "name": f"API {i}", "email": f"api{i}@example.com", "phone": "9876543210",
+            "date": start_day.isoformat(), "time": "10:00", "doctor_name": "Dr. Bench Mark",
+        }), range(queries)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=4)
+    parser.add_argument("--pages-per-doc", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--conversations", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--embed-latency-ms", type=float, default=20.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--db-latency-ms", type=float, default=10.0)
+    parser.add_argument("--email-latency-ms", type=float, default=20.0)
+    parser.add_argument("--only", nargs="+", choices=["cold_start", "ingest", "rag", "doctors", "booking_flow", "api"])
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    latency = Latency(
+        embed=args.embed_latency_ms / 1000, llm=args.llm_latency_ms / 1000,
+        db=args.db_latency_ms / 1000, email=args.email_latency_ms / 1000,
+    )
+    out_path = os.path.abspath(args.out) if args.out else None
+    # index, embedding cache and email outbox all live under relative paths; keep them out of the repo
+    workdir = tempfile.mkdtemp(prefix="rag-bench-")
+    os.chdir(workdir)
+
+    llm, database, email = install(latency)
+    import utils.rag_pipeline as rp
+
+    sections = args.only or ["cold_start", "ingest", "rag", "doctors", "booking_flow", "api"]
+    results = {}
+    if "cold_start" in sections:
+        # fresh interpreters, so this is unaffected by the fakes installed above
+        results["cold_start"] = {module: measure_import(module, forbidden) for module, (_, forbidden) in TARGETS.items()}
+    if "ingest" in sections or any(s in sections for s in ("rag", "doctors", "api")):
+        ingest = bench_ingest(rp, args)
+        if "ingest" in sections:
+            results["ingest"] = ingest
+    if "rag" in sections:
+        results.update(bench_rag(rp, args))
+    if "doctors" in sections:
+        results.update(bench_doctor_search(rp, args))
+    if "booking_flow" in sections:
+        results.update(bench_booking_flow(args))
+    if "api" in sections:
+        results.update(bench_api(args))
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "only")},
+        "latency_s": latency.as_dict(),
+        "counters": {"llm_calls": llm.calls, "db_requests": database.requests, "emails_received": email.received},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, default=str)
+    if out_path:
+        with open(out_path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Wrote {out_path}", file=sys.stderr)
+    else:
+        print(text)
+    email.close()
+
+if __name__ == "__main__":
+    main()
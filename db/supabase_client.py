@@ -1,5 +1,8 @@
 import os
-from supabase import create_client
+import asyncio
+import weakref
+import threading
+from utils.tracing import traced
 from dotenv import load_dotenv
 
 # Load environment variables from .env if present
@@ -8,59 +11,327 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise RuntimeError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in your environment or .env file.")
+def _require_credentials():
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        raise RuntimeError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in your environment or .env file.")
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+# the supabase package is slow to import and the client is only needed once we
+# touch the database, so both happen on first use
+_client = None
+_client_lock = threading.Lock()
 
-def save_booking(data):
-    # Ensure customer exists or upsert
-    customer_payload = {
+def get_supabase():
+    """Process-wide Supabase client, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _require_credentials()
+                from supabase import create_client
+                _client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _client
+
+def __getattr__(name):
+    # keeps `from db.supabase_client import supabase` working without an import-time client
+    if name == "supabase":
+        return get_supabase()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# async clients hold loop-bound HTTP connections, so keep one per event loop
+_async_clients = weakref.WeakKeyDictionary()
+
+async def get_async_supabase():
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        _require_credentials()
+        from supabase import acreate_client
+        client = await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+        _async_clients[loop] = client
+    return client
+
+def _customer_payload(data):
+    return {
         "name": data["name"],
         "email": data["email"],
         "phone": data["phone"]
     }
+
+def _booking_payload(data, customer_id):
+    return {
+        "customer_id": customer_id,
+        "booking_type": data.get("booking_type", "Doctor Appointment"),
+        "date": data.get("date"),
+        "time": data.get("time"),
+        "status": "confirmed",
+        "doctor_name": data.get("doctor_name")
+    }
+
+BOOKING_RPC = "book_with_customer"
+BULK_BOOKING_RPC = "bulk_book_with_customers"
+BOOKING_COUNTS_RPC = "booking_counts"
+BULK_IMPORT_BATCH_SIZE = 1000
+
+# None until the first call tells us whether the server-side functions exist
+_rpc_available = {BOOKING_RPC: None, BULK_BOOKING_RPC: None, BOOKING_COUNTS_RPC: None}
+
+def _is_missing_function(error):
+    from postgrest.exceptions import APIError
+    # PostgREST answers PGRST202 when the function isn't in its schema cache
+    return isinstance(error, APIError) and (
+        error.code == "PGRST202" or "Could not find the function" in (error.message or "")
+    )
+
+def _rpc_params(data):
+    return {
+        "p_name": data["name"],
+        "p_email": data["email"],
+        "p_phone": data["phone"],
+        "p_booking_type": data.get("booking_type", "Doctor Appointment"),
+        "p_date": data.get("date"),
+        "p_time": data.get("time"),
+        "p_doctor_name": data.get("doctor_name")
+    }
+
+def _bulk_row(data):
+    return {
+        "name": data["name"],
+        "email": data["email"],
+        "phone": data.get("phone"),
+        "booking_type": data.get("booking_type", "Doctor Appointment"),
+        "date": str(data["date"]) if data.get("date") is not None else None,
+        "time": data.get("time"),
+        "doctor_name": data.get("doctor_name")
+    }
+
+def _rpc_booking_id(data):
+    # a scalar function comes back as the bare value
+    if isinstance(data, list):
+        data = data[0] if data else None
+    if isinstance(data, dict):
+        data = data.get("id", data.get(BOOKING_RPC))
+    if data is None:
+        raise RuntimeError("Failed to insert booking")
+    return int(data)
+
+def _save_booking_legacy(data):
+    # Ensure customer exists or upsert
+    customer_payload = _customer_payload(data)
     # Using upsert with on_conflict if supported, else select/insert
     try:
-        customer_resp = supabase.table("customers").upsert(customer_payload, on_conflict="email").execute()
+        customer_resp = get_supabase().table("customers").upsert(customer_payload, on_conflict="email").execute()
         if customer_resp.data:
             customer = customer_resp.data[0]
         else:
             raise RuntimeError("Failed to upsert customer")
     except Exception as e:
         # Fallback if upsert fails or behaves unexpectedly
-        sel = supabase.table("customers").select("*").eq("email", data["email"]).execute()
+        sel = get_supabase().table("customers").select("*").eq("email", data["email"]).execute()
         if sel.data:
             customer = sel.data[0]
         else:
-            customer_resp = supabase.table("customers").insert(customer_payload).execute()
+            customer_resp = get_supabase().table("customers").insert(customer_payload).execute()
             customer = customer_resp.data[0]
 
     customer_id = customer.get("customer_id")
 
-    booking_payload = {
-        "customer_id": customer_id,
-        "booking_type": data.get("booking_type", "Doctor Appointment"),
-        "date": data.get("date"),
-        "time": data.get("time"),
-        "status": "confirmed",
-        "doctor_name": data.get("doctor_name")
-    }
-    booking_resp = supabase.table("bookings").insert(booking_payload).execute()
+    booking_payload = _booking_payload(data, customer_id)
+    booking_resp = get_supabase().table("bookings").insert(booking_payload).execute()
     if not booking_resp.data:
         raise RuntimeError("Failed to insert booking")
     
     booking = booking_resp.data[0]
     return booking["id"]
 
+@traced("db.save_booking")
+def save_booking(data):
+    """Persist a booking and its customer, returning the new booking id.
+
+    Uses the ``book_with_customer`` function (see README) so the customer
+    upsert and booking insert happen in one request and one transaction.
+    Databases without the function fall back to separate table calls.
+    """
+    if _rpc_available[BOOKING_RPC] is not False:
+        try:
+            resp = get_supabase().rpc(BOOKING_RPC, _rpc_params(data)).execute()
+            _rpc_available[BOOKING_RPC] = True
+            return _rpc_booking_id(resp.data)
+        except Exception as e:
+            if not _is_missing_function(e):
+                raise
+            _rpc_available[BOOKING_RPC] = False
+    return _save_booking_legacy(data)
+
+async def _asave_booking_legacy(client, data):
+    customer_payload = _customer_payload(data)
+    try:
+        customer_resp = await client.table("customers").upsert(customer_payload, on_conflict="email").execute()
+        if customer_resp.data:
+            customer = customer_resp.data[0]
+        else:
+            raise RuntimeError("Failed to upsert customer")
+    except Exception:
+        sel = await client.table("customers").select("*").eq("email", data["email"]).execute()
+        if sel.data:
+            customer = sel.data[0]
+        else:
+            customer_resp = await client.table("customers").insert(customer_payload).execute()
+            customer = customer_resp.data[0]
+
+    booking_payload = _booking_payload(data, customer.get("customer_id"))
+    booking_resp = await client.table("bookings").insert(booking_payload).execute()
+    if not booking_resp.data:
+        raise RuntimeError("Failed to insert booking")
+    return booking_resp.data[0]["id"]
+
+@traced("db.save_booking")
+async def asave_booking(data):
+    """Async variant of save_booking using the async Supabase client."""
+    client = await get_async_supabase()
+    if _rpc_available[BOOKING_RPC] is not False:
+        try:
+            resp = await client.rpc(BOOKING_RPC, _rpc_params(data)).execute()
+            _rpc_available[BOOKING_RPC] = True
+            return _rpc_booking_id(resp.data)
+        except Exception as e:
+            if not _is_missing_function(e):
+                raise
+            _rpc_available[BOOKING_RPC] = False
+    return await _asave_booking_legacy(client, data)
+
+def _bulk_import_legacy(rows):
+    # two requests per batch: upsert every distinct customer, then insert the bookings
+    customers = {}
+    for row in rows:
+        customers[row["email"]] = {"name": row["name"], "email": row["email"], "phone": row["phone"]}
+    resp = get_supabase().table("customers").upsert(list(customers.values()), on_conflict="email").execute()
+    ids = {c["email"]: c["customer_id"] for c in resp.data or []}
+    missing = [email for email in customers if email not in ids]
+    if missing:
+        sel = get_supabase().table("customers").select("customer_id,email").in_("email", missing).execute()
+        ids.update({c["email"]: c["customer_id"] for c in sel.data or []})
+
+    payload = [_booking_payload(row, ids.get(row["email"])) for row in rows]
+    booking_resp = get_supabase().table("bookings").insert(payload).execute()
+    if len(booking_resp.data or []) != len(rows):
+        raise RuntimeError("Failed to insert bookings")
+    return [b["id"] for b in booking_resp.data]
+
+@traced("db.bulk_import")
+def bulk_import_bookings(bookings, batch_size=BULK_IMPORT_BATCH_SIZE):
+    """Insert many bookings, returning their ids in input order.
+
+    Each batch is a single ``bulk_book_with_customers`` call (see README), or
+    a customer upsert plus a booking insert when the function is missing.
+    Batches commit independently, so a failure part way leaves the earlier
+    batches in place; the error is raised with the number already saved.
+    """
+    rows = [_bulk_row(b) for b in bookings]
+    booking_ids = []
+    for start in range(0, len(rows), max(1, batch_size)):
+        batch = rows[start:start + batch_size]
+        try:
+            booking_ids.extend(_bulk_import_batch(batch))
+        except Exception as e:
+            raise RuntimeError(f"Bulk import failed after {len(booking_ids)} bookings: {e}") from e
+    return booking_ids
+
+def _bulk_import_batch(rows):
+    if _rpc_available[BULK_BOOKING_RPC] is not False:
+        try:
+            resp = get_supabase().rpc(BULK_BOOKING_RPC, {"p_rows": rows}).execute()
+            _rpc_available[BULK_BOOKING_RPC] = True
+            return [r["id"] if isinstance(r, dict) else int(r) for r in resp.data or []]
+        except Exception as e:
+            if not _is_missing_function(e):
+                raise
+            _rpc_available[BULK_BOOKING_RPC] = False
+    return _bulk_import_legacy(rows)
+
+BOOKING_COLUMNS = "id,customer_id,booking_type,date,time,status,created_at,doctor_name"
+BOOKING_GROUPS = {"day": "date", "doctor": "doctor_name", "status": "status"}
+
+@traced("db.all_bookings")
 def get_all_bookings():
-    resp = supabase.table("bookings").select("id,customer_id,booking_type,date,time,status,created_at,doctor_name").execute()
+    resp = get_supabase().table("bookings").select(BOOKING_COLUMNS).execute()
     return resp.data
 
+def _filter_bookings(query, date_from=None, date_to=None, doctor=None, status=None):
+    if date_from:
+        query = query.gte("date", str(date_from))
+    if date_to:
+        query = query.lte("date", str(date_to))
+    if doctor:
+        query = query.eq("doctor_name", doctor)
+    if status:
+        query = query.eq("status", status)
+    return query
+
+@traced("db.bookings_page")
+def get_bookings_page(limit=50, after_id=None, date_from=None, date_to=None, doctor=None, status=None):
+    """Return one page of bookings, newest first, and the cursor for the next page.
+
+    Pagination is keyed on ``id`` rather than an offset, so every page costs
+    the same however deep it is. Pass the returned cursor back as
+    ``after_id``; it is None on the last page.
+    """
+    query = _filter_bookings(get_supabase().table("bookings").select(BOOKING_COLUMNS),
+                             date_from, date_to, doctor, status)
+    if after_id is not None:
+        query = query.lt("id", after_id)
+    # one extra row tells us whether another page exists
+    resp = query.order("id", desc=True).limit(limit + 1).execute()
+    rows = resp.data or []
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+def _count_bookings_by_column(column, date_from, date_to, doctor, status, page_size=1000):
+    # fallback without the server-side function: only the grouped column crosses the wire
+    counts = {}
+    after_id = None
+    while True:
+        query = _filter_bookings(get_supabase().table("bookings").select(f"id,{column}"),
+                                 date_from, date_to, doctor, status)
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        rows = query.order("id").limit(page_size).execute().data or []
+        for row in rows:
+            key = row.get(column)
+            counts[key] = counts.get(key, 0) + 1
+        if len(rows) < page_size:
+            return counts
+        after_id = rows[-1]["id"]
+
+@traced("db.booking_counts")
+def count_bookings(group_by="day", date_from=None, date_to=None, doctor=None, status=None):
+    """Count bookings per day, doctor or status, as ``{key: count}``.
+
+    Uses the ``booking_counts`` function (see README) so the database does
+    the grouping; without it only the grouped column is fetched and counted here.
+    """
+    column = BOOKING_GROUPS[group_by]
+    if _rpc_available[BOOKING_COUNTS_RPC] is not False:
+        params = {
+            "p_group": group_by,
+            "p_date_from": str(date_from) if date_from else None,
+            "p_date_to": str(date_to) if date_to else None,
+            "p_doctor": doctor,
+            "p_status": status
+        }
+        try:
+            resp = get_supabase().rpc(BOOKING_COUNTS_RPC, params).execute()
+            _rpc_available[BOOKING_COUNTS_RPC] = True
+            return {row["key"]: row["count"] for row in resp.data or []}
+        except Exception as e:
+            if not _is_missing_function(e):
+                raise
+            _rpc_available[BOOKING_COUNTS_RPC] = False
+    return _count_bookings_by_column(column, date_from, date_to, doctor, status)
+
 # Simple user functions for signup/login (not secure for production)
 def create_user(email, password, is_admin=False):
     try:
-        resp = supabase.table("users").upsert({
+        resp = get_supabase().table("users").upsert({
             "email": email,
             "password": password,
             "is_admin": is_admin
@@ -69,9 +340,10 @@ def create_user(email, password, is_admin=False):
     except Exception:
         return None
 
+@traced("db.authenticate")
 def authenticate_user(email, password):
     try:
-        resp = supabase.table("users").select("email,is_admin").eq("email", email).eq("password", password).single().execute()
+        resp = get_supabase().table("users").select("email,is_admin").eq("email", email).eq("password", password).single().execute()
         return resp.data
     except Exception:
         return None
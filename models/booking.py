@@ -1,25 +1,84 @@
 # models/booking.py
 """
 Data models for doctors, appointments, and FAQs for the AI Booking Assistant.
+Models use __slots__, and appointment slots are held as integer epoch minutes
+(minutes since 1970-01-01 00:00, clinic wall-clock time); the "YYYY-MM-DD HH:MM"
+string form is only produced at the edges.
 """
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
+
+_EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+
+Slot = Union[str, int]
+
+def slot_to_minute(slot: Slot) -> int:
+    """"2026-01-22 10:00" -> epoch minute. Ints are passed through; anything else raises ValueError."""
+    if isinstance(slot, int):
+        return slot
+    if not isinstance(slot, str) or len(slot) != 16 or slot[10] != " ":
+        raise ValueError(f"Slot {slot!r} is not in 'YYYY-MM-DD HH:MM' format")
+    dt = datetime.fromisoformat(slot)
+    return (dt.toordinal() - _EPOCH_ORDINAL) * 1440 + dt.hour * 60 + dt.minute
+
+def minute_to_slot(minute: int) -> str:
+    days, minutes = divmod(minute, 1440)
+    hours, minutes = divmod(minutes, 60)
+    return f"{datetime.fromordinal(days + _EPOCH_ORDINAL).date().isoformat()} {hours:02d}:{minutes:02d}"
 
 class Doctor:
+    __slots__ = ("name", "specialization", "available_slots", "_slot_set", "_synced")
+
     def __init__(self, name: str, specialization: str, available_slots: List[str]):
         self.name = name
         self.specialization = specialization
         self.available_slots = available_slots  # e.g., ["2026-01-22 10:00", ...]
+        self._sync()
+
+    def _sync(self):
+        self._slot_set = {slot_to_minute(slot) for slot in self.available_slots}
+        self._synced = len(self.available_slots)
+
+    def has_slot(self, slot: Slot) -> bool:
+        # available_slots may be edited in place; resync the lookup set when it changes size
+        if self._synced != len(self.available_slots):
+            self._sync()
+        try:
+            return slot_to_minute(slot) in self._slot_set
+        except ValueError:
+            return False
 
 class Appointment:
-    def __init__(self, patient_name: str, doctor_name: str, slot: str, email: str):
+    __slots__ = ("patient_name", "doctor_name", "minute", "email", "created")
+
+    def __init__(self, patient_name: str, doctor_name: str, slot: Slot, email: str,
+                 created: Optional[float] = None):
         self.patient_name = patient_name
         self.doctor_name = doctor_name
-        self.slot = slot  # e.g., "2026-01-22 10:00"
+        self.minute = slot_to_minute(slot)
         self.email = email
-        self.created_at = datetime.now()
+        self.created = datetime.now().timestamp() if created is None else created  # epoch seconds
+
+    @property
+    def slot(self) -> str:
+        return minute_to_slot(self.minute)  # e.g., "2026-01-22 10:00"
+
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self.created)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "patient_name": self.patient_name,
+            "doctor_name": self.doctor_name,
+            "slot": self.slot,
+            "email": self.email,
+            "created_at": self.created_at,
+        }
 
 class FAQ:
+    __slots__ = ("question", "answer")
+
     def __init__(self, question: str, answer: str):
         self.question = question
         self.answer = answer
@@ -1,6 +1,12 @@
 import os
+import math
+import time
+import random
+import hashlib
+import threading
 from dotenv import load_dotenv
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from langchain_core.embeddings import Embeddings
+from utils.embedding_cache import content_hash, get_embedding_cache
 
 load_dotenv()
 
@@ -9,6 +15,8 @@ def get_gemini_embeddings():
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise RuntimeError("GEMINI_API_KEY missing. Set GEMINI_API_KEY in your .env or environment.")
+    # imported here: the Google GenAI client is slow to import and only needed once we embed
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
     try:
         embeddings = GoogleGenerativeAIEmbeddings(
             model="models/gemini-embedding-001",
@@ -22,3 +30,101 @@ def get_gemini_embeddings():
             "Please renew your GEMINI_API_KEY and ensure it's set in your environment. "
             f"Underlying error: {e}"
         ) from e
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Read-through wrapper around an embeddings client: vectors are looked up in the
+    on-disk EmbeddingCache by content hash and only misses are sent to the API.
+    """
+    def __init__(self, underlying: Embeddings, cache=None, model_name: str = None):
+        self.underlying = underlying
+        self.cache = cache if cache is not None else get_embedding_cache()
+        self.model_name = model_name or getattr(underlying, "model", type(underlying).__name__)
+
+    def _lookup_documents(self, texts):
+        # documents and queries use different task types, so keep them apart in the cache
+        model = f"{self.model_name}:document"
+        hashes = [content_hash(t) for t in texts]
+        found = self.cache.get_many(model, hashes)
+        missing = {}
+        for h, text in zip(hashes, texts):
+            if h not in found and h not in missing:
+                missing[h] = text
+        return model, hashes, found, missing
+
+    def _store(self, model, found, missing, vectors):
+        fresh = dict(zip(missing.keys(), vectors))
+        self.cache.put_many(model, fresh)
+        found.update(fresh)
+
+    def embed_documents(self, texts):
+        model, hashes, found, missing = self._lookup_documents(texts)
+        if missing:
+            self._store(model, found, missing, self.underlying.embed_documents(list(missing.values())))
+        return [found[h] for h in hashes]
+
+    async def aembed_documents(self, texts):
+        model, hashes, found, missing = self._lookup_documents(texts)
+        if missing:
+            self._store(model, found, missing, await self.underlying.aembed_documents(list(missing.values())))
+        return [found[h] for h in hashes]
+
+    def embed_query(self, text):
+        model, h = f"{self.model_name}:query", content_hash(text)
+        vector = self.cache.get(model, h)
+        if vector is None:
+            vector = self.underlying.embed_query(text)
+            self.cache.put_many(model, {h: vector})
+        return vector
+
+    async def aembed_query(self, text):
+        model, h = f"{self.model_name}:query", content_hash(text)
+        vector = self.cache.get(model, h)
+        if vector is None:
+            vector = await self.underlying.aembed_query(text)
+            self.cache.put_many(model, {h: vector})
+        return vector
+
+def get_cached_embeddings():
+    """Gemini embeddings behind the persistent on-disk embedding cache."""
+    return CachedEmbeddings(get_gemini_embeddings())
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Deterministic local embedder for offline tests and benchmarks.
+    Vectors are derived from the text hash, so identical text always maps to the same vector.
+    latency is seconds per embed call; rate_limit_every > 0 raises a simulated 429 on every Nth call.
+    """
+    def __init__(self, size: int = 768, latency: float = 0.0, rate_limit_every: int = 0):
+        self.size = size
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.model = f"fake-{size}"
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _vector(self, text):
+        seed = hashlib.sha256(text.encode("utf-8")).digest()
+        rng = random.Random(seed)
+        vec = [rng.uniform(-1.0, 1.0) for _ in range(self.size)]
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+        if self.latency:
+            time.sleep(self.latency)
+        if self.rate_limit_every and calls % self.rate_limit_every == 0:
+            raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+
+    def embed_documents(self, texts):
+        self._call()
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        self._call()
+        return self._vector(text)
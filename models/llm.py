@@ -1,13 +1,15 @@
 import os
 import sys
-from langchain_groq import ChatGroq
-from langchain_google_genai import ChatGoogleGenerativeAI
+
+# the LangChain provider packages take most of a second to import, so they are
+# loaded on first use rather than when this module is imported
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 
 def get_chatgroq_model():
     """Initialize and return the Groq chat model"""
+    from langchain_groq import ChatGroq
     try:
         # Initialize the Groq chat model with the API key
         groq_model = ChatGroq(
@@ -24,7 +26,8 @@ def get_gemini_llm():
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("GEMINI_API_KEY not found in environment variables")
+    from langchain_google_genai import ChatGoogleGenerativeAI
     return ChatGoogleGenerativeAI(
         model="gemini-3-flash-preview",
         google_api_key=api_key
-    )
\ No newline at end of file
+    )
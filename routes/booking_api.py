@@ -1,11 +1,59 @@
 # routes/booking_api.py
 """
 Flask API routes for booking assistant actions: book, cancel, FAQ, etc.
+Book, cancel and FAQ also have /batch variants with per-item results, and
+GET /appointments streams a doctor / date-range listing as NDJSON.
+Chat, doctor search and booking persistence are async views (requires flask[async]),
+so their Gemini / Supabase round trips are awaited rather than blocking; confirmation
+emails are queued on the email outbox.
 """
-from flask import Blueprint, request, jsonify
-from utils.booking_utils import book_appointment, cancel_appointment, get_faq_answer
+import os
+from datetime import date
+from flask import Blueprint, Response, current_app, g, request, jsonify, stream_with_context
+from utils.booking_utils import (
+    book_appointment, cancel_appointment, match_faq, availability,
+    book_appointments, cancel_appointments, match_faqs, appointments_in_range, find_doctor_by_name,
+)
+from db.supabase_client import asave_booking
+from models.booking import slot_to_minute
+from tools.email_outbox import enqueue_booking_email
+from utils.intent_router import BOOKING, get_intent_router
+from utils.tracing import finish_trace, render_prometheus, start_trace
+from utils.warmup import warm_up_if_enabled
+
+MAX_BATCH_ITEMS = int(os.getenv("MAX_BATCH_ITEMS", "500"))
+BATCH_MODES = ('best_effort', 'all_or_nothing')
+BOOKING_REPLY = (
+    "I can book that for you. Check free times with GET /availability, then send patient_name, "
+    "doctor_name, slot and email to POST /book."
+)
 
 booking_api = Blueprint('booking_api', __name__)
+# WARMUP_ON_START=1 preloads the RAG stack and clients in the background once the app registers us
+booking_api.record_once(lambda state: warm_up_if_enabled())
+
+@booking_api.before_request
+def _start_request_trace():
+    # label by route pattern, not raw path, so the metric stays low-cardinality
+    rule = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.trace, g.trace_token = start_trace(f"{request.method} {rule}", request.headers.get('X-Trace-Id'))
+
+@booking_api.after_request
+def _tag_trace_id(response):
+    trace = g.get('trace')
+    if trace is not None:
+        response.headers['X-Trace-Id'] = trace.trace_id
+    return response
+
+@booking_api.teardown_request
+def _finish_request_trace(exc):
+    trace = g.pop('trace', None)
+    if trace is not None:
+        finish_trace(trace, g.pop('trace_token', None), error=exc is not None)
+
+@booking_api.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(render_prometheus() + get_intent_router().render_prometheus(), mimetype='text/plain; version=0.0.4')
 
 @booking_api.route('/book', methods=['POST'])
 def book():
@@ -17,7 +65,7 @@ def book():
         email=data.get('email')
     )
     if appt:
-        return jsonify({'status': 'success', 'appointment': appt.__dict__})
+        return jsonify({'status': 'success', 'appointment': appt.to_dict()})
     return jsonify({'status': 'error', 'message': 'Slot not available or doctor not found'}), 400
 
 @booking_api.route('/cancel', methods=['POST'])
@@ -35,7 +83,175 @@ def cancel():
 @booking_api.route('/faq', methods=['GET'])
 def faq():
     question = request.args.get('question')
-    answer = get_faq_answer(question)
-    if answer:
-        return jsonify({'answer': answer})
+    match = match_faq(question)
+    if match:
+        faq, score = match
+        return jsonify({'answer': faq.answer, 'question': faq.question, 'confidence': round(score, 3)})
     return jsonify({'answer': 'Sorry, I do not have an answer for that.'}), 404
+
+def _batch_request(key='items'):
+    """Parse a batch body; returns (items, all_or_nothing, error_response)."""
+    data = request.get_json(silent=True) or {}
+    items = data.get(key)
+    mode = data.get('mode', 'best_effort')
+    if not isinstance(items, list) or not items:
+        return None, False, (jsonify({'status': 'error', 'message': f'{key} must be a non-empty list'}), 400)
+    if len(items) > MAX_BATCH_ITEMS:
+        return None, False, (jsonify({'status': 'error', 'message': f'At most {MAX_BATCH_ITEMS} {key} per batch'}), 413)
+    if mode not in BATCH_MODES:
+        return None, False, (jsonify({'status': 'error', 'message': f"mode must be one of {', '.join(BATCH_MODES)}"}), 400)
+    return items, mode == 'all_or_nothing', None
+
+def _batch_response(results, all_or_nothing):
+    succeeded = sum(1 for r in results if r['status'] == 'success')
+    body = {'status': 'success' if succeeded == len(results) else ('error' if not succeeded else 'partial'),
+            'succeeded': succeeded, 'failed': len(results) - succeeded, 'results': results}
+    # all-or-nothing batches that were rolled back are a conflict as a whole
+    return jsonify(body), 409 if all_or_nothing and succeeded < len(results) else 200
+
+@booking_api.route('/book/batch', methods=['POST'])
+def book_batch():
+    items, all_or_nothing, error = _batch_request()
+    if error:
+        return error
+    items = [item if isinstance(item, dict) else {} for item in items]
+    booked = book_appointments(
+        [(item.get('patient_name'), item.get('doctor_name'), item.get('slot'), item.get('email')) for item in items],
+        all_or_nothing,
+    )
+    results = [
+        {'index': i, 'status': 'success', 'appointment': appt.to_dict()} if appt
+        else {'index': i, 'status': 'error', 'message': message}
+        for i, (appt, message) in enumerate(booked)
+    ]
+    return _batch_response(results, all_or_nothing)
+
+@booking_api.route('/cancel/batch', methods=['POST'])
+def cancel_batch():
+    items, all_or_nothing, error = _batch_request()
+    if error:
+        return error
+    items = [item if isinstance(item, dict) else {} for item in items]
+    cancelled = cancel_appointments(
+        [(item.get('patient_name'), item.get('doctor_name'), item.get('slot')) for item in items],
+        all_or_nothing,
+    )
+    # a rolled-back batch can't say which item was missing, only that one was
+    failure = 'Batch rolled back: an appointment was not found' if all_or_nothing else 'Appointment not found'
+    results = [
+        {'index': i, 'status': 'success'} if ok
+        else {'index': i, 'status': 'error', 'message': failure}
+        for i, ok in enumerate(cancelled)
+    ]
+    return _batch_response(results, all_or_nothing)
+
+@booking_api.route('/faq/batch', methods=['POST'])
+def faq_batch():
+    questions, _, error = _batch_request('questions')
+    if error:
+        return error
+    results = []
+    for i, found in enumerate(match_faqs([q if isinstance(q, str) else '' for q in questions])):
+        if found:
+            faq, score = found
+            results.append({'index': i, 'status': 'success', 'answer': faq.answer,
+                            'question': faq.question, 'confidence': round(score, 3)})
+        else:
+            results.append({'index': i, 'status': 'error', 'answer': 'Sorry, I do not have an answer for that.'})
+    return _batch_response(results, False)
+
+def _range_bound(value, end=False):
+    """YYYY-MM-DD or 'YYYY-MM-DD HH:MM' -> epoch minute; a bare end date covers that whole day."""
+    if not value:
+        return None
+    if len(value) == 10:
+        return slot_to_minute(f"{date.fromisoformat(value).isoformat()} 00:00") + (1439 if end else 0)
+    return slot_to_minute(value)
+
+@booking_api.route('/appointments', methods=['GET'])
+def list_appointments():
+    doctor = request.args.get('doctor')
+    try:
+        start = _range_bound(request.args.get('start'))
+        end = _range_bound(request.args.get('end'), end=True)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': "start/end must be YYYY-MM-DD or 'YYYY-MM-DD HH:MM'"}), 400
+    if not doctor and not (start and end):
+        return jsonify({'status': 'error', 'message': 'doctor or both start and end are required'}), 400
+    appts = appointments_in_range(doctor, start, end)
+    dumps = current_app.json.dumps
+
+    def generate():
+        # one JSON object per line, so clients can process large listings incrementally
+        for appt in appts:
+            yield dumps(appt.to_dict()) + '\n'
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@booking_api.route('/availability', methods=['GET'])
+def get_availability():
+    doctor = request.args.get('doctor')
+    specialization = request.args.get('specialization')
+    if not doctor and not specialization:
+        return jsonify({'status': 'error', 'message': 'doctor or specialization is required'}), 400
+    try:
+        start = date.fromisoformat(request.args['start']) if request.args.get('start') else None
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else None
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'start/end must be YYYY-MM-DD and limit an integer'}), 400
+    if limit < 0:
+        return jsonify({'status': 'error', 'message': 'limit must not be negative'}), 400
+    if doctor:
+        # same name resolution as /book, so "Alice" finds "Dr. Alice Smith"
+        found = find_doctor_by_name(doctor)
+        if found is None:
+            return jsonify({'slots': []})
+        slots = [{'doctor': found.name, 'slot': slot} for slot in availability.free_slots(found.name, start, end, limit)]
+    else:
+        slots = [{'doctor': name, 'slot': slot} for slot, name in availability.first_free(specialization, start, end, limit)]
+    return jsonify({'slots': slots})
+
+@booking_api.route('/chat', methods=['POST'])
+async def chat():
+    data = request.json or {}
+    message = data.get('message')
+    if not message:
+        return jsonify({'status': 'error', 'message': 'message is required'}), 400
+    # small talk and FAQ hits are answered locally without touching the RAG stack
+    route = get_intent_router().route(message)
+    if route.reply is not None:
+        return jsonify({'answer': route.reply, 'intent': route.intent})
+    # bookings go through /book, so the router's LLM-call counts hold for this endpoint too
+    if route.intent == BOOKING:
+        return jsonify({'answer': BOOKING_REPLY, 'intent': route.intent})
+    # the RAG stack (LangChain, FAISS, Gemini) loads on the first chat, not at worker start
+    from utils.rag_pipeline import aanswer_query_with_rag
+    answer = await aanswer_query_with_rag(route.text)
+    return jsonify({'answer': answer, 'intent': route.intent})
+
+@booking_api.route('/doctors/search', methods=['POST'])
+async def search_doctors():
+    data = request.json or {}
+    query = data.get('query')
+    if not query:
+        return jsonify({'status': 'error', 'message': 'query is required'}), 400
+    from utils.rag_pipeline import afind_doctor_suggestions
+    doctors = await afind_doctor_suggestions(query)
+    return jsonify({'doctors': doctors})
+
+@booking_api.route('/bookings', methods=['POST'])
+async def create_booking():
+    data = request.json or {}
+    missing = [f for f in ('name', 'email', 'phone', 'date', 'time') if not data.get(f)]
+    if missing:
+        return jsonify({'status': 'error', 'message': f"Missing fields: {', '.join(missing)}"}), 400
+    try:
+        booking_id = await asave_booking(data)
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': f'Failed to save booking: {e}'}), 500
+    try:
+        enqueue_booking_email(data['email'], booking_id)
+        email_queued = True
+    except Exception:
+        email_queued = False
+    return jsonify({'status': 'success', 'booking_id': booking_id, 'email_queued': email_queued})
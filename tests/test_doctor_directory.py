@@ -0,0 +1,18 @@
+from utils.doctor_directory import DoctorDirectory, stem
+
+RECORDS = [
+    {"name": "Dr. Asha Rao", "specialization": "Pediatrician"},
+    {"name": "Dr. Ben Cole", "specialization": "General Physician"},
+    {"name": "Dr. Cara Lin", "specialization": "Cardiologist"},
+]
+
+def test_pediatric_symptom_routes_to_pediatrician():
+    directory = DoctorDirectory(RECORDS)
+    assert stem("pediatrician") == "pediatr"
+    assert [r["name"] for r in directory.search("doctor for my baby")] == ["Dr. Asha Rao"]
+    assert directory.search("my child has a cough")[0]["name"] == "Dr. Asha Rao"
+    assert directory.search("my kids")[0]["name"] == "Dr. Asha Rao"
+
+def test_plural_symptoms_match():
+    directory = DoctorDirectory(RECORDS)
+    assert [r["name"] for r in directory.search("I keep getting headaches")] == ["Dr. Ben Cole"]
@@ -0,0 +1,239 @@
+# tools/email_outbox.py
+"""
+Durable outbox for booking confirmation emails.
+
+Bookings enqueue a row in a local SQLite table and return straight away; a
+daemon thread claims due rows in batches, sends them over the pooled session
+from email_tool and reschedules failures with exponential backoff. Rows that
+keep failing end up with status 'failed' instead of being lost; sent rows are
+deleted by the worker once they are older than the retention window.
+"""
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from tools.email_tool import email_payload, deliver_email, EMAIL_POOL_SIZE
+from utils.tracing import traced
+
+DEFAULT_OUTBOX_PATH = os.getenv("EMAIL_OUTBOX_PATH", os.path.join(".cache", "email_outbox.sqlite"))
+DEFAULT_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "20"))
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "8"))
+DEFAULT_SENT_RETENTION = float(os.getenv("EMAIL_OUTBOX_SENT_RETENTION", "86400"))  # seconds
+
+PENDING, SENDING, SENT, FAILED = "pending", "sending", "sent", "failed"
+
+class EmailOutbox:
+    """
+    SQLite-backed queue of email payloads. ``send`` delivers one payload and
+    raises on failure (EmailDeliveryError.retryable=False marks it failed
+    immediately). Rows left in 'sending' by a crashed worker are reclaimed
+    after ``lease`` seconds.
+    """
+    def __init__(self, path: str = DEFAULT_OUTBOX_PATH, send: Callable[[dict], None] = deliver_email,
+                 batch_size: int = DEFAULT_BATCH_SIZE, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 base_delay: float = 2.0, max_delay: float = 600.0, lease: float = 120.0,
+                 workers: int = min(4, EMAIL_POOL_SIZE), poll_interval: float = 5.0,
+                 sent_retention: float = DEFAULT_SENT_RETENTION):
+        self.path = path
+        self.send = send
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = lease
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.sent_retention = sent_retention
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL, status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0, next_attempt REAL NOT NULL, last_error TEXT,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt)")
+
+    def enqueue(self, payload: dict) -> int:
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO outbox (payload, status, next_attempt, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (json.dumps(payload), PENDING, now, now, now),
+            )
+        self._wake.set()
+        return cur.lastrowid
+
+    def claim(self, limit: Optional[int] = None) -> List[tuple]:
+        """Atomically move up to ``limit`` due rows to 'sending' and return (id, payload, attempts)."""
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front so two processes can't claim the same rows
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, payload, attempts FROM outbox"
+                    " WHERE (status = ? AND next_attempt <= ?) OR (status = ? AND updated_at <= ?)"
+                    " ORDER BY next_attempt LIMIT ?",
+                    (PENDING, now, SENDING, now - self.lease, limit or self.batch_size),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE outbox SET status = ?, updated_at = ? WHERE id = ?",
+                    [(SENDING, now, row[0]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [(row_id, json.loads(payload), attempts) for row_id, payload, attempts in rows]
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _record(self, results: List[tuple]):
+        now = time.time()
+        updates = []
+        for row_id, attempts, error in results:
+            if error is None:
+                updates.append((SENT, attempts, now, None, now, row_id))
+                continue
+            retryable = getattr(error, "retryable", True)
+            if not retryable or attempts >= self.max_attempts:
+                updates.append((FAILED, attempts, now, str(error), now, row_id))
+            else:
+                updates.append((PENDING, attempts, now + self._backoff(attempts), str(error), now, row_id))
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt = ?, last_error = ?, updated_at = ?"
+                " WHERE id = ?",
+                updates,
+            )
+
+    def _send_one(self, payload: dict):
+        try:
+            self.send(payload)
+            return None
+        except Exception as e:
+            return e
+
+    def drain_once(self) -> int:
+        """Send one batch of due emails; returns how many rows were attempted."""
+        batch = self.claim()
+        if not batch:
+            return 0
+        if self.workers > 1 and len(batch) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(batch))) as pool:
+                errors = list(pool.map(self._send_one, [payload for _, payload, _ in batch]))
+        else:
+            errors = [self._send_one(payload) for _, payload, _ in batch]
+        self._record([(row_id, attempts + 1, error) for (row_id, _, attempts), error in zip(batch, errors)])
+        return len(batch)
+
+    def prune_sent(self) -> int:
+        """Delete rows sent more than ``sent_retention`` seconds ago; returns how many went."""
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM outbox WHERE status = ? AND updated_at <= ?", (SENT, time.time() - self.sent_retention)
+            )
+        return cur.rowcount
+
+    def _next_due_in(self) -> float:
+        with self._lock:
+            (due,) = self._conn.execute(
+                "SELECT MIN(next_attempt) FROM outbox WHERE status = ?", (PENDING,)
+            ).fetchone()
+        if due is None:
+            return self.poll_interval
+        return max(0.0, min(self.poll_interval, due - time.time()))
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                while self.drain_once() and not self._stop.is_set():
+                    pass
+                self.prune_sent()
+            except Exception as e:
+                print("Email outbox error:", e)
+            self._wake.wait(self._next_due_in())
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Block until nothing is pending or in flight (for scripts and shutdown)."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            counts = self.stats()
+            if not counts.get(PENDING) and not counts.get(SENDING):
+                return True
+            if self._thread is None or not self._thread.is_alive():
+                self.drain_once()
+            time.sleep(0.05)
+        return False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return dict(rows)
+
+    def failed(self, limit: int = 50) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload, attempts, last_error, updated_at FROM outbox WHERE status = ?"
+                " ORDER BY updated_at DESC LIMIT ?",
+                (FAILED, limit),
+            ).fetchall()
+        return [
+            {"id": row_id, "payload": json.loads(payload), "attempts": attempts, "error": error, "updated_at": updated}
+            for row_id, payload, attempts, error, updated in rows
+        ]
+
+    def retry_failed(self) -> int:
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = 0, next_attempt = ?, updated_at = ? WHERE status = ?",
+                (PENDING, now, now, FAILED),
+            )
+        self._wake.set()
+        return cur.rowcount
+
+_default_outbox = None
+_default_outbox_lock = threading.Lock()
+
+def get_email_outbox() -> EmailOutbox:
+    """Process-wide outbox at EMAIL_OUTBOX_PATH, with its worker thread started."""
+    global _default_outbox
+    if _default_outbox is None:
+        with _default_outbox_lock:
+            if _default_outbox is None:
+                _default_outbox = EmailOutbox().start()
+    return _default_outbox
+
+@traced("email.enqueue")
+def enqueue_booking_email(to_email, booking_id) -> int:
+    """Queue a booking confirmation; delivery happens on the outbox worker."""
+    return get_email_outbox().enqueue(email_payload(to_email, booking_id))
@@ -1,20 +1,66 @@
 import os
-import requests
+import threading
+from utils.tracing import traced
 
 EMAIL_SERVICE_URL = os.getenv("EMAIL_SERVICE_URL", "https://ai-booking-email-sender.vercel.app/booking-confirmation")
+EMAIL_TIMEOUT = float(os.getenv("EMAIL_TIMEOUT", "10"))
+EMAIL_POOL_SIZE = int(os.getenv("EMAIL_POOL_SIZE", "8"))
 
-def send_booking_email(to_email, booking_id, booking_data):
-    payload = {
+class EmailDeliveryError(Exception):
+    """The email service rejected or failed a send; ``retryable`` says whether to try again."""
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_email_session():
+    """Shared requests session so sends reuse keep-alive connections to the email service."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                # HTTP stacks are imported on first send to keep worker cold start light
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=EMAIL_POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+def email_payload(to_email, booking_id):
+    return {
         "booking_id": booking_id,
         "to": to_email
     }
+
+@traced("email.send")
+def deliver_email(payload, session=None):
+    """POST one payload to the email service, raising EmailDeliveryError on failure."""
+    import requests
+    session = session or get_email_session()
+    try:
+        resp = session.post(EMAIL_SERVICE_URL, json=payload, timeout=EMAIL_TIMEOUT)
+    except requests.RequestException as e:
+        raise EmailDeliveryError(f"{type(e).__name__}: {e}") from e
+    if resp.status_code == 200:
+        try:
+            if resp.json().get("success"):
+                return
+        except ValueError:
+            pass
+    # client errors won't succeed on retry, except rate limiting
+    retryable = resp.status_code >= 500 or resp.status_code in (200, 408, 429)
+    raise EmailDeliveryError(f"Email API error {resp.status_code}: {resp.text[:200]}", retryable=retryable)
+
+def send_booking_email(to_email, booking_id, booking_data):
+    payload = email_payload(to_email, booking_id)
     try:
-        resp = requests.post(EMAIL_SERVICE_URL, json=payload, timeout=10)
-        if resp.status_code == 200 and resp.json().get("success"):
-            return True
-        else:
-            print("Email API error:", resp.status_code, resp.text)
-            return False
-    except Exception as e:
-        print("Email API exception:", e)
+        deliver_email(payload)
+        return True
+    except EmailDeliveryError as e:
+        print("Email API error:", e)
         return False
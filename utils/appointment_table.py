@@ -0,0 +1,249 @@
+# utils/appointment_table.py
+"""
+Columnar appointment table: one NumPy array per field instead of one Python object
+per appointment. Doctors are interned to int32 ids, slots are epoch minutes (see
+models.booking) and patient names / emails live in one UTF-8 buffer per column with
+end offsets, so a row costs a few dozen bytes and range scans by doctor / date
+window are vectorized masks. Snapshots are a single uncompressed .npz file that
+reloads straight into the arrays without parsing any text.
+"""
+import io
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+import numpy as np
+from models.booking import Appointment, Slot, slot_to_minute
+
+SNAPSHOT_VERSION = 1
+
+_COLUMNS = (
+    ("doctor", np.int32),
+    ("minute", np.int64),
+    ("created", np.float64),
+    ("patient_end", np.int64),
+    ("email_end", np.int64),
+    ("live", np.bool_),
+)
+_TEXT = ("patient", "email")
+
+class AppointmentTable:
+    """
+    Append-only columns with tombstones for removals; (doctor, minute) is unique among
+    live rows. The (doctor, minute) -> row dict needed for add/get/remove is only built
+    on first use, so tables that are bulk-loaded and scanned never pay for it.
+    compact() (also run by save()) drops removed rows.
+    """
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.Lock()
+        self._cols: Dict[str, np.ndarray] = {name: np.zeros(max(capacity, 1), dtype) for name, dtype in _COLUMNS}
+        self._text: Dict[str, bytearray] = {name: bytearray() for name in _TEXT}
+        self._n = 0
+        self._live = 0
+        self._doctors: List[str] = []
+        self._doctor_ids: Dict[str, int] = {}
+        self._rows: Optional[Dict[tuple, int]] = None  # (doctor id, minute) -> row, built lazily
+
+    def _doctor_id(self, name: str) -> int:
+        did = self._doctor_ids.get(name)
+        if did is None:
+            did = self._doctor_ids[name] = len(self._doctors)
+            self._doctors.append(name)
+        return did
+
+    def _grow(self, needed: int):
+        capacity = len(self._cols["minute"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, col in self._cols.items():
+            grown = np.zeros(capacity, col.dtype)
+            grown[:self._n] = col[:self._n]
+            self._cols[name] = grown
+
+    def _index(self) -> Dict[tuple, int]:
+        if self._rows is None:
+            n, cols = self._n, self._cols
+            live = np.flatnonzero(cols["live"][:n])
+            self._rows = dict(zip(zip(cols["doctor"][live].tolist(), cols["minute"][live].tolist()), live.tolist()))
+        return self._rows
+
+    def _append(self, doctor: int, appt: Appointment):
+        row = self._n
+        cols = self._cols
+        cols["doctor"][row] = doctor
+        cols["minute"][row] = appt.minute
+        cols["created"][row] = appt.created
+        for name, value in (("patient", appt.patient_name), ("email", appt.email)):
+            buf = self._text[name]
+            buf += (value or "").encode("utf-8")
+            cols[f"{name}_end"][row] = len(buf)
+        cols["live"][row] = True
+        self._n += 1
+        self._live += 1
+
+    def add(self, appt: Appointment) -> bool:
+        """Append ``appt``; False if its doctor already has a live appointment at that minute."""
+        with self._lock:
+            rows = self._index()
+            key = (self._doctor_id(appt.doctor_name), appt.minute)
+            if key in rows:
+                return False
+            self._grow(self._n + 1)
+            rows[key] = self._n
+            self._append(key[0], appt)
+        return True
+
+    def extend(self, appts: Iterable[Appointment]) -> int:
+        return sum(self.add(appt) for appt in appts)
+
+    def _find(self, doctor_name: str, slot: Slot) -> Optional[int]:
+        doctor = self._doctor_ids.get(doctor_name)
+        if doctor is None:
+            return None
+        try:
+            return self._index().get((doctor, slot_to_minute(slot)))
+        except ValueError:
+            return None
+
+    def remove(self, doctor_name: str, slot: Slot, patient_name: Optional[str] = None) -> bool:
+        """Tombstone the appointment at (doctor, slot), optionally only if it belongs to ``patient_name``."""
+        with self._lock:
+            row = self._find(doctor_name, slot)
+            if row is None:
+                return False
+            if patient_name is not None and self._string("patient", row) != patient_name:
+                return False
+            self._cols["live"][row] = False
+            del self._rows[(int(self._cols["doctor"][row]), int(self._cols["minute"][row]))]
+            self._live -= 1
+        return True
+
+    def get(self, doctor_name: str, slot: Slot) -> Optional[Appointment]:
+        with self._lock:
+            row = self._find(doctor_name, slot)
+            return None if row is None else self._materialize(row)
+
+    def _string(self, name: str, row: int) -> str:
+        ends = self._cols[f"{name}_end"]
+        start = int(ends[row - 1]) if row else 0
+        return self._text[name][start:int(ends[row])].decode("utf-8")
+
+    def _materialize(self, row: int) -> Appointment:
+        cols = self._cols
+        return Appointment(
+            self._string("patient", row), self._doctors[cols["doctor"][row]], int(cols["minute"][row]),
+            self._string("email", row), float(cols["created"][row]),
+        )
+
+    def scan(self, doctor_name: Optional[str] = None, start: Optional[int] = None,
+             end: Optional[int] = None) -> np.ndarray:
+        """Row ids of live appointments with start <= minute <= end, for one doctor or all, earliest first."""
+        with self._lock:
+            n = self._n
+            minute = self._cols["minute"][:n]
+            mask = self._cols["live"][:n].copy()
+            if doctor_name is not None:
+                doctor = self._doctor_ids.get(doctor_name)
+                if doctor is None:
+                    return np.empty(0, np.int64)
+                mask &= self._cols["doctor"][:n] == doctor
+            if start is not None:
+                mask &= minute >= start
+            if end is not None:
+                mask &= minute <= end
+            rows = np.flatnonzero(mask)
+            return rows[np.argsort(minute[rows], kind="stable")]
+
+    def in_range(self, doctor_name: Optional[str] = None, start: Optional[int] = None,
+                 end: Optional[int] = None) -> List[Appointment]:
+        rows = self.scan(doctor_name, start, end)
+        with self._lock:
+            return [self._materialize(row) for row in rows.tolist()]
+
+    def count_by_doctor(self, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, int]:
+        """Live appointments per doctor in the window, counted with one bincount."""
+        rows = self.scan(None, start, end)
+        counts = np.bincount(self._cols["doctor"][rows], minlength=len(self._doctors))
+        return {self._doctors[did]: int(c) for did, c in enumerate(counts) if c}
+
+    def compact(self):
+        with self._lock:
+            n, cols = self._n, self._cols
+            keep = np.flatnonzero(cols["live"][:n])
+            if len(keep) == n:
+                return
+            for name in _TEXT:
+                ends = cols[f"{name}_end"][:n]
+                starts = np.concatenate(([0], ends[:-1]))
+                buf = self._text[name]
+                self._text[name] = bytearray(b"".join(buf[s:e] for s, e in zip(starts[keep].tolist(), ends[keep].tolist())))
+                cols[f"{name}_end"][:len(keep)] = np.cumsum(ends[keep] - starts[keep])
+            for name in ("doctor", "minute", "created", "live"):
+                cols[name][:len(keep)] = cols[name][keep]
+            self._n = len(keep)
+            self._rows = None
+
+    def nbytes(self) -> int:
+        """Bytes held by the used part of the columns and text buffers."""
+        return sum(col[:self._n].nbytes for col in self._cols.values()) + sum(len(b) for b in self._text.values())
+
+    def save(self, path: str):
+        self.compact()
+        with self._lock:
+            arrays = {name: col[:self._n] for name, col in self._cols.items() if name != "live"}
+            for name in _TEXT:
+                arrays[f"{name}_bytes"] = np.frombuffer(bytes(self._text[name]), np.uint8)
+            doctors = [name.encode("utf-8") for name in self._doctors]
+            arrays["doctor_ends"] = np.cumsum([len(b) for b in doctors], dtype=np.int64)
+            arrays["doctor_bytes"] = np.frombuffer(b"".join(doctors), np.uint8)
+            arrays["version"] = np.array([SNAPSHOT_VERSION], np.int32)
+            buf = io.BytesIO()
+            np.savez(buf, **arrays)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(buf.getbuffer())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "AppointmentTable":
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"][0]) != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported appointment snapshot version {int(data['version'][0])}")
+            n = len(data["minute"])
+            table = cls(capacity=n)
+            for name, _ in _COLUMNS:
+                if name != "live":
+                    table._cols[name][:n] = data[name]
+            for name in _TEXT:
+                table._text[name] = bytearray(data[f"{name}_bytes"].tobytes())
+            doctor_ends = data["doctor_ends"].tolist()
+            doctor_bytes = data["doctor_bytes"].tobytes()
+        table._cols["live"][:n] = True
+        table._n = table._live = n
+        table._doctors = [doctor_bytes[s:e].decode("utf-8") for s, e in zip([0] + doctor_ends[:-1], doctor_ends)]
+        table._doctor_ids = {name: i for i, name in enumerate(table._doctors)}
+        return table
+
+    @classmethod
+    def from_appointments(cls, appts: Iterable[Appointment]) -> "AppointmentTable":
+        """Bulk build; later duplicates of a (doctor, minute) are skipped. No lookup index is built."""
+        appts = appts if hasattr(appts, "__len__") else list(appts)
+        table = cls(capacity=len(appts))
+        seen = set()
+        for appt in appts:
+            key = (table._doctor_id(appt.doctor_name), appt.minute)
+            if key in seen:
+                continue
+            seen.add(key)
+            table._grow(table._n + 1)
+            table._append(key[0], appt)
+        return table
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __iter__(self) -> Iterator[Appointment]:
+        with self._lock:
+            rows = np.flatnonzero(self._cols["live"][:self._n]).tolist()
+        return (self._materialize(row) for row in rows)
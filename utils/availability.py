@@ -0,0 +1,158 @@
+# utils/availability.py
+"""
+Availability engine: each doctor's schedule is a per-day bitset of SLOT_MINUTES slots
+(bit i = minutes i*SLOT_MINUTES..). Open and booked slots are separate bitsets, so the
+free slots of a day are `open & ~booked` and finding the next free slot is a few
+integer operations instead of a scan over appointment strings.
+"""
+import logging
+import threading
+from bisect import bisect_left
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from models.booking import Slot, minute_to_slot, slot_to_minute
+
+SLOT_MINUTES = 15
+
+logger = logging.getLogger(__name__)
+
+def parse_slot(slot: Slot) -> Tuple[date, int]:
+    """"2026-01-22 10:00" (or its epoch minute) -> (date(2026, 1, 22), bit index of 10:00)."""
+    minute = slot_to_minute(slot)
+    minutes = minute % 1440
+    if minutes % SLOT_MINUTES:
+        raise ValueError(f"Slot {slot!r} is not aligned to {SLOT_MINUTES}-minute boundaries")
+    return date.fromisoformat(minute_to_slot(minute)[:10]), minutes // SLOT_MINUTES
+
+def _grid_slot(slot: Slot) -> Optional[Tuple[date, int]]:
+    """parse_slot(), or None for a slot that isn't on the SLOT_MINUTES grid (it has no bit)."""
+    try:
+        return parse_slot(slot)
+    except ValueError:
+        return None
+
+def format_slot(day: date, bit: int) -> str:
+    hours, minutes = divmod(bit * SLOT_MINUTES, 60)
+    return f"{day.isoformat()} {hours:02d}:{minutes:02d}"
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+class AvailabilityEngine:
+    """Per-doctor, per-day open/booked bitsets plus a specialization index."""
+    def __init__(self, doctors: Iterable = ()):
+        self._lock = threading.Lock()
+        self._open: Dict[str, Dict[date, int]] = {}
+        self._booked: Dict[str, Dict[date, int]] = {}
+        self._days: Dict[str, List[date]] = {}  # sorted days with open slots, per doctor
+        self._by_specialization: Dict[str, List[str]] = {}
+        # union of open slots over a specialization's doctors, per day, and its sorted days
+        self._spec_open: Dict[str, Dict[date, int]] = {}
+        self._spec_days: Dict[str, List[date]] = {}
+        for doctor in doctors:
+            self.add_doctor(doctor)
+
+    def add_doctor(self, doctor):
+        with self._lock:
+            open_days = self._open.setdefault(doctor.name, {})
+            self._booked.setdefault(doctor.name, {})
+            for slot in doctor.available_slots:
+                parsed = _grid_slot(slot)
+                if parsed is None:
+                    # still bookable by exact slot, just not listed by the bitset queries
+                    logger.warning("Skipping off-grid slot %r for %s", slot, doctor.name)
+                    continue
+                day, bit = parsed
+                open_days[day] = open_days.get(day, 0) | (1 << bit)
+            self._days[doctor.name] = sorted(open_days)
+            spec = doctor.specialization.lower()
+            names = self._by_specialization.setdefault(spec, [])
+            if doctor.name not in names:
+                names.append(doctor.name)
+            spec_open = self._spec_open.setdefault(spec, {})
+            for day, mask in open_days.items():
+                spec_open[day] = spec_open.get(day, 0) | mask
+            self._spec_days[spec] = sorted(spec_open)
+
+    def _set_booked(self, doctor_name: str, slot: Slot, booked: bool):
+        parsed = _grid_slot(slot)
+        if parsed is None:
+            return  # off-grid slots were never in the bitsets
+        day, bit = parsed
+        with self._lock:
+            days = self._booked.setdefault(doctor_name, {})
+            mask = days.get(day, 0)
+            days[day] = mask | (1 << bit) if booked else mask & ~(1 << bit)
+
+    def mark_booked(self, doctor_name: str, slot: Slot):
+        self._set_booked(doctor_name, slot, True)
+
+    def mark_free(self, doctor_name: str, slot: Slot):
+        self._set_booked(doctor_name, slot, False)
+
+    def is_free(self, doctor_name: str, slot: Slot) -> bool:
+        parsed = _grid_slot(slot)
+        if parsed is None:
+            return False
+        day, bit = parsed
+        free = self._open.get(doctor_name, {}).get(day, 0) & ~self._booked.get(doctor_name, {}).get(day, 0)
+        return bool(free >> bit & 1)
+
+    def _iter_free(self, doctor_name: str, start: date, end: date) -> Iterator[Tuple[str, str]]:
+        """(slot, doctor) pairs in time order for days in [start, end]."""
+        days = self._days.get(doctor_name, [])
+        open_days = self._open[doctor_name]
+        booked_days = self._booked[doctor_name]
+        for i in range(bisect_left(days, start), len(days)):
+            day = days[i]
+            if day > end:
+                return
+            for bit in _bits(open_days[day] & ~booked_days.get(day, 0)):
+                yield format_slot(day, bit), doctor_name
+
+    def free_slots(self, doctor_name: str, start: Optional[date] = None, end: Optional[date] = None, limit: int = 50) -> List[str]:
+        """Free slots for one doctor between start and end (default: the next 7 days)."""
+        start = start or date.today()
+        end = end or start + timedelta(days=6)
+        if doctor_name not in self._open:
+            return []
+        return [slot for slot, _ in self._first(self._iter_free(doctor_name, start, end), limit)]
+
+    def first_free(self, specialization: str, start: Optional[date] = None, end: Optional[date] = None, limit: int = 10) -> List[Tuple[str, str]]:
+        """First `limit` free (slot, doctor) pairs across all doctors of a specialization, earliest first."""
+        if limit <= 0:
+            return []
+        start = start or date.today()
+        end = end or start + timedelta(days=6)
+        spec = specialization.lower()
+        names = self._by_specialization.get(spec, [])
+        spec_open = self._spec_open.get(spec, {})
+        days = self._spec_days.get(spec, [])
+        found = []
+        # walk the specialization's open slots in time order and only then look at individual
+        # doctors, so the cost depends on `limit` rather than on how many doctors there are
+        for i in range(bisect_left(days, start), len(days)):
+            day = days[i]
+            if day > end:
+                break
+            for bit in _bits(spec_open[day]):
+                for name in names:
+                    free = self._open[name].get(day, 0) & ~self._booked[name].get(day, 0)
+                    if free >> bit & 1:
+                        found.append((format_slot(day, bit), name))
+                        if len(found) >= limit:
+                            return found
+        return found
+
+    @staticmethod
+    def _first(iterator, limit):
+        for i, item in enumerate(iterator):
+            if i >= limit:
+                return
+            yield item
+
+    def specializations(self) -> List[str]:
+        return sorted(self._by_specialization)
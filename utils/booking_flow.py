@@ -1,6 +1,6 @@
-from models.llm import get_gemini_llm
-from utils.rag_pipeline import answer_query_with_rag, find_doctor_suggestions
 from db.supabase_client import save_booking as _save_booking
+from utils.booking_utils import availability, find_doctor_by_name
+from datetime import date
 
 class BookingFlow:
     REQUIRED_FIELDS = ["name", "email", "phone", "booking_type", "date", "time"]
@@ -72,8 +72,8 @@ class BookingFlow:
                 elif field == "date" and len(message.strip()) == 10 and "-" in message:
                     self.data[field] = message.strip()
                 elif field == "time":
-                    # Automatically set time to "09:00" (beginning hour) if not already set
-                    self.data[field] = "09:00"
+                    # Automatically pick the doctor's first free slot that day, else "09:00" (beginning hour)
+                    self.data[field] = self._default_time()
 
         missing = [f for f in self.REQUIRED_FIELDS if f not in self.data]
         if not missing and not self.awaiting_confirmation:
@@ -98,6 +98,21 @@ class BookingFlow:
             next_field = missing[0]
             return get_field_prompt(next_field), False, None
 
+    def _default_time(self):
+        doctor_name = self.data.get("doctor_name")
+        if doctor_name and self.data.get("date"):
+            try:
+                day = date.fromisoformat(self.data["date"])
+            except ValueError:
+                day = None
+            # the typed name may be partial ("Alice"); availability is keyed by the canonical name
+            doctor = find_doctor_by_name(doctor_name)
+            if day and doctor:
+                slots = availability.free_slots(doctor.name, day, day, limit=1)
+                if slots:
+                    return slots[0].split(" ")[1]
+        return "09:00"
+
     def save_booking(self, booking_data):
         # wrapper to call DB save and return booking id
         return _save_booking(booking_data)
@@ -2,45 +2,277 @@
 """
 Utility functions for booking logic: find doctor, check slot, manage appointments, etc.
 """
-from models.booking import Doctor, Appointment, FAQ
-from typing import List, Optional
+import bisect
+import heapq
+import threading
+from models.booking import Doctor, Appointment, FAQ, Slot, slot_to_minute
+from utils.appointment_table import AppointmentTable
+from utils.availability import AvailabilityEngine
+from utils.name_index import NameIndex
+from utils.faq_engine import FAQEngine
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+class AppointmentStore:
+    """
+    Thread-safe in-memory appointment store indexed by (doctor, slot minute), by patient and
+    by doctor (minutes kept sorted for range queries). Availability checks, booking and
+    cancellation are O(1) apart from the sorted-minute insert; book() checks and inserts
+    under one lock so two concurrent requests can never take the same slot. Slots may be
+    given as "YYYY-MM-DD HH:MM" strings or epoch minutes. When an ``availability`` engine
+    is given, its booked bitsets are updated under the same lock as the store.
+    """
+    def __init__(self, availability: Optional[AvailabilityEngine] = None):
+        self._lock = threading.Lock()
+        self._availability = availability
+        self._by_slot: Dict[Tuple[str, int], Appointment] = {}
+        self._by_patient: Dict[str, Dict[Tuple[str, int], Appointment]] = {}
+        self._by_doctor: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def _key(doctor_name: str, slot: Slot) -> Optional[Tuple[str, int]]:
+        try:
+            return doctor_name, slot_to_minute(slot)
+        except ValueError:
+            return None
+
+    def is_booked(self, doctor_name: str, slot: Slot) -> bool:
+        return self._key(doctor_name, slot) in self._by_slot
+
+    def _insert(self, key: Tuple[str, int], appt: Appointment):
+        self._by_slot[key] = appt
+        self._by_patient.setdefault(appt.patient_name, {})[key] = appt
+        bisect.insort(self._by_doctor.setdefault(appt.doctor_name, []), appt.minute)
+        if self._availability is not None:
+            self._availability.mark_booked(appt.doctor_name, appt.minute)
+
+    def _remove(self, key: Optional[Tuple[str, int]], patient_name: str) -> bool:
+        appt = self._by_slot.get(key)
+        if appt is None or appt.patient_name != patient_name:
+            return False
+        del self._by_slot[key]
+        patient_appts = self._by_patient[patient_name]
+        del patient_appts[key]
+        if not patient_appts:
+            del self._by_patient[patient_name]
+        minutes = self._by_doctor[key[0]]
+        del minutes[bisect.bisect_left(minutes, key[1])]
+        if not minutes:
+            del self._by_doctor[key[0]]
+        if self._availability is not None:
+            self._availability.mark_free(key[0], key[1])
+        return True
+
+    def book(self, appt: Appointment) -> bool:
+        key = (appt.doctor_name, appt.minute)
+        with self._lock:
+            if key in self._by_slot:
+                return False
+            self._insert(key, appt)
+        return True
+
+    def cancel(self, patient_name: str, doctor_name: str, slot: Slot) -> bool:
+        key = self._key(doctor_name, slot)
+        with self._lock:
+            return self._remove(key, patient_name)
+
+    def book_many(self, appts: List[Appointment], all_or_nothing: bool = False) -> List[bool]:
+        """
+        Book a batch under one lock acquisition. Returns per-item success; with
+        all_or_nothing a single taken slot (or a slot repeated within the batch) books none.
+        """
+        with self._lock:
+            seen = set()
+            ok = []
+            for appt in appts:
+                key = (appt.doctor_name, appt.minute)
+                ok.append(key not in self._by_slot and key not in seen)
+                seen.add(key)
+            if all_or_nothing and not all(ok):
+                return [False] * len(appts)
+            for appt, free in zip(appts, ok):
+                if free:
+                    self._insert((appt.doctor_name, appt.minute), appt)
+        return ok
+
+    def cancel_many(self, items: List[Tuple[str, str, Slot]], all_or_nothing: bool = False) -> List[bool]:
+        """Cancel (patient, doctor, slot) items under one lock; all_or_nothing cancels none unless all match."""
+        keys = [self._key(doctor, slot) for _, doctor, slot in items]
+        with self._lock:
+            if all_or_nothing:
+                valid = len(set(keys)) == len(keys) and all(
+                    self._by_slot.get(key) is not None and self._by_slot[key].patient_name == patient
+                    for key, (patient, _, _) in zip(keys, items)
+                )
+                if not valid:
+                    return [False] * len(items)
+            return [self._remove(key, patient) for key, (patient, _, _) in zip(keys, items)]
+
+    def in_range(self, doctor_name: Optional[str] = None, start: Optional[int] = None,
+                 end: Optional[int] = None) -> List[Appointment]:
+        """
+        Appointments with start <= minute <= end (epoch minutes, either bound optional),
+        ordered by slot then doctor. Snapshot taken under the lock.
+        """
+        with self._lock:
+            doctors = [doctor_name] if doctor_name else list(self._by_doctor)
+            runs = []
+            for doctor in doctors:
+                minutes = self._by_doctor.get(doctor, [])
+                lo = bisect.bisect_left(minutes, start) if start is not None else 0
+                hi = bisect.bisect_right(minutes, end) if end is not None else len(minutes)
+                runs.append([(minute, doctor, self._by_slot[(doctor, minute)]) for minute in minutes[lo:hi]])
+        if len(runs) == 1:
+            return [appt for _, _, appt in runs[0]]
+        return [appt for _, _, appt in heapq.merge(*runs, key=lambda item: (item[0], item[1]))]
+
+    def for_patient(self, patient_name: str) -> List[Appointment]:
+        with self._lock:
+            return list(self._by_patient.get(patient_name, {}).values())
+
+    def clear(self):
+        with self._lock:
+            if self._availability is not None:
+                for doctor_name, minute in self._by_slot:
+                    self._availability.mark_free(doctor_name, minute)
+            self._by_slot.clear()
+            self._by_patient.clear()
+            self._by_doctor.clear()
+
+    def to_table(self) -> AppointmentTable:
+        """Columnar copy of the current appointments (for snapshots and bulk scans)."""
+        return AppointmentTable.from_appointments(self)
+
+    def __len__(self) -> int:
+        return len(self._by_slot)
+
+    def __iter__(self) -> Iterator[Appointment]:
+        with self._lock:
+            return iter(list(self._by_slot.values()))
 
 # Example in-memory data (replace with DB in production)
 doctors = [
     Doctor("Dr. Alice Smith", "Cardiology", ["2026-01-22 10:00", "2026-01-22 11:00"]),
     Doctor("Dr. Bob Jones", "Dermatology", ["2026-01-22 12:00", "2026-01-22 13:00"]),
 ]
-appointments: List[Appointment] = []
+availability = AvailabilityEngine(doctors)
+appointments = AppointmentStore(availability)
+doctor_names: NameIndex[Doctor] = NameIndex(doctors)
 faqs = [
     FAQ("What are the clinic timings?", "Monday to Saturday, 9 AM to 6 PM."),
     FAQ("Where is the clinic located?", "123 Main St, Cityville."),
 ]
+faq_engine = FAQEngine(faqs)
+
+def add_doctor(doctor: Doctor):
+    """Register a doctor and update the lookup indexes incrementally."""
+    doctors.append(doctor)
+    doctor_names.add(doctor)
+    availability.add_doctor(doctor)
 
 def find_doctor_by_name(name: str) -> Optional[Doctor]:
-    for doc in doctors:
-        if name.lower() in doc.name.lower():
-            return doc
-    return None
+    # best-ranked match: exact name, then whole tokens, then prefixes. No fuzzy fallback:
+    # this resolves the doctor for bookings, where a near miss must not pick someone else
+    if not name:
+        return None
+    return doctor_names.best(name, fuzzy=False)
+
+def search_doctors_by_name(name: str, limit: int = 5) -> List[Tuple[Doctor, float]]:
+    return doctor_names.search(name, limit=limit)
 
-def is_slot_available(doctor: Doctor, slot: str) -> bool:
-    return slot in doctor.available_slots and all(a.slot != slot or a.doctor_name != doctor.name for a in appointments)
+def is_slot_available(doctor: Doctor, slot: Slot) -> bool:
+    return doctor.has_slot(slot) and not appointments.is_booked(doctor.name, slot)
 
-def book_appointment(patient_name: str, doctor_name: str, slot: str, email: str) -> Optional[Appointment]:
+def book_appointment(patient_name: str, doctor_name: str, slot: Slot, email: str) -> Optional[Appointment]:
     doctor = find_doctor_by_name(doctor_name)
-    if doctor and is_slot_available(doctor, slot):
+    if doctor and doctor.has_slot(slot):
         appt = Appointment(patient_name, doctor.name, slot, email)
-        appointments.append(appt)
-        return appt
+        # the store re-checks the slot and updates availability under its lock,
+        # so a concurrent booking or cancellation can't slip in between
+        if appointments.book(appt):
+            return appt
     return None
 
-def cancel_appointment(patient_name: str, doctor_name: str, slot: str) -> bool:
-    global appointments
-    before = len(appointments)
-    appointments = [a for a in appointments if not (a.patient_name == patient_name and a.doctor_name == doctor_name and a.slot == slot)]
-    return len(appointments) < before
+def cancel_appointment(patient_name: str, doctor_name: str, slot: Slot) -> bool:
+    return appointments.cancel(patient_name, doctor_name, slot)
+
+def book_appointments(items: Iterable[Tuple[str, str, str, str]], all_or_nothing: bool = False) -> List[Tuple[Optional[Appointment], str]]:
+    """
+    Book (patient_name, doctor_name, slot, email) items. Returns (appointment, error) per item,
+    error being "" on success. With all_or_nothing one failure books nothing.
+    """
+    items = list(items)
+    results: List[Tuple[Optional[Appointment], str]] = [(None, "")] * len(items)
+    pending: List[Tuple[int, Appointment]] = []
+    for i, (patient_name, doctor_name, slot, email) in enumerate(items):
+        doctor = find_doctor_by_name(doctor_name)
+        if doctor is None:
+            results[i] = (None, "Doctor not found")
+        elif not doctor.has_slot(slot):
+            results[i] = (None, "Slot not offered by this doctor")
+        else:
+            pending.append((i, Appointment(patient_name, doctor.name, slot, email)))
+    if all_or_nothing and len(pending) < len(items):
+        return [(None, error or "Not booked: another item in the batch failed") for _, error in results]
+    if all_or_nothing:
+        # book_many reports all False on a rollback, so ask which slots were the problem
+        taken = set()
+        seen = set()
+        for i, appt in pending:
+            key = (appt.doctor_name, appt.minute)
+            if key in seen or appointments.is_booked(*key):
+                taken.add(i)
+            seen.add(key)
+    booked = appointments.book_many([appt for _, appt in pending], all_or_nothing)
+    if all_or_nothing and not all(booked):
+        return [
+            (None, "Slot unavailable" if i in taken else "Not booked: another item in the batch failed")
+            for i, _ in pending
+        ]
+    for (i, appt), ok in zip(pending, booked):
+        if ok:
+            results[i] = (appt, "")
+        else:
+            results[i] = (None, "Slot unavailable")
+    return results
+
+def cancel_appointments(items: Iterable[Tuple[str, str, str]], all_or_nothing: bool = False) -> List[bool]:
+    """Cancel (patient_name, doctor_name, slot) items; with all_or_nothing either all or none are cancelled."""
+    return appointments.cancel_many(list(items), all_or_nothing)
+
+def appointments_in_range(doctor_name: Optional[str] = None, start: Optional[int] = None,
+                          end: Optional[int] = None) -> List[Appointment]:
+    """Booked appointments for a doctor and/or an inclusive epoch-minute window, earliest first."""
+    if doctor_name:
+        doctor = find_doctor_by_name(doctor_name)
+        if doctor is None:
+            return []
+        doctor_name = doctor.name
+    return appointments.in_range(doctor_name, start, end)
+
+def save_appointments(path: str) -> int:
+    """Write a binary snapshot of all appointments; returns how many were saved."""
+    table = appointments.to_table()
+    table.save(path)
+    return len(table)
+
+def load_appointments(path: str) -> int:
+    """Restore appointments from a snapshot written by save_appointments(); returns how many were added."""
+    return sum(appointments.book_many(list(AppointmentTable.load(path))))
+
+def load_faqs(source):
+    """Bulk-load FAQs from a JSON/CSV file path or an iterable of FAQ / (question, answer) / dict items."""
+    before = len(faq_engine)
+    if isinstance(source, str):
+        faq_engine.load_file(source)
+    else:
+        faq_engine.load(source)
+    faqs.extend(faq_engine.faqs[before:])
+
+def match_faq(question: str) -> Optional[Tuple[FAQ, float]]:
+    return faq_engine.match(question)
+
+def match_faqs(questions: Iterable[str]) -> List[Optional[Tuple[FAQ, float]]]:
+    return faq_engine.match_many(questions)
 
 def get_faq_answer(question: str) -> Optional[str]:
-    for faq in faqs:
-        if question.lower() in faq.question.lower():
-            return faq.answer
-    return None
+    return faq_engine.answer(question)
@@ -0,0 +1,122 @@
+# utils/docstore.py
+"""
+Compact, pickle-free docstore for the FAISS vector store.
+Chunk text and metadata live in one contiguous file with an offset table and a
+sorted id table, read lazily through mmap. Only the chunks a search returns are
+ever decoded, and opening the file costs the same whatever the corpus size.
+
+File layout (little endian):
+    magic b"RAGDOCS1" | count u64
+    offsets (count + 1) x u64          record i is data[offsets[i]:offsets[i+1]]
+    ids count x (64s id, u64 position) sorted by id, for lookups by chunk id
+    data: UTF-8 JSON records {"id", "text", "metadata"}
+"""
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from typing import Iterable, Optional, Union
+from langchain_core.documents import Document
+from langchain_community.docstore.base import Docstore
+
+MAGIC = b"RAGDOCS1"
+_HEADER = struct.Struct("<8sQ")
+_OFFSET = struct.Struct("<Q")
+_ID_ENTRY = struct.Struct("<64sQ")
+ID_WIDTH = 64
+
+def write_docstore(path: str, docs: Iterable[Document]):
+    """Write documents in vector-position order (document i belongs to vector i)."""
+    records, ids = [], []
+    for doc in docs:
+        doc_id = doc.id or ""
+        if len(doc_id.encode("ascii")) > ID_WIDTH:
+            raise ValueError(f"Docstore ids are limited to {ID_WIDTH} ASCII characters: {doc_id!r}")
+        ids.append(doc_id)
+        records.append(json.dumps({"id": doc_id, "text": doc.page_content, "metadata": doc.metadata}, ensure_ascii=False).encode("utf-8"))
+    count = len(records)
+    offsets = [0]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, count))
+        f.write(b"".join(_OFFSET.pack(o) for o in offsets))
+        for doc_id, pos in sorted((doc_id, pos) for pos, doc_id in enumerate(ids)):
+            f.write(_ID_ENTRY.pack(doc_id.encode("ascii"), pos))
+        for record in records:
+            f.write(record)
+    os.replace(tmp, path)
+
+class MmapDocstore(Docstore):
+    """Read-only docstore over a file written by write_docstore. search() accepts a vector position or a chunk id."""
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a docstore file")
+        self._offsets_at = _HEADER.size
+        self._ids_at = self._offsets_at + (self.count + 1) * _OFFSET.size
+        self._data_at = self._ids_at + self.count * _ID_ENTRY.size
+
+    def __len__(self):
+        return self.count
+
+    def _offset(self, i: int) -> int:
+        return _OFFSET.unpack_from(self._mm, self._offsets_at + i * _OFFSET.size)[0]
+
+    def _id_entry(self, i: int):
+        raw_id, pos = _ID_ENTRY.unpack_from(self._mm, self._ids_at + i * _ID_ENTRY.size)
+        return raw_id.rstrip(b"\0").decode("ascii"), pos
+
+    def position(self, doc_id: str) -> Optional[int]:
+        # binary search over the sorted id table without materializing it
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._id_entry(mid)[0] < doc_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count:
+            found_id, pos = self._id_entry(lo)
+            if found_id == doc_id:
+                return pos
+        return None
+
+    def read(self, position: int) -> Document:
+        start, end = self._offset(position), self._offset(position + 1)
+        record = json.loads(self._mm[self._data_at + start:self._data_at + end].decode("utf-8"))
+        return Document(id=record["id"] or None, page_content=record["text"], metadata=record["metadata"])
+
+    def search(self, search: Union[int, str]) -> Union[str, Document]:
+        position = search if isinstance(search, int) else self.position(search)
+        if position is None or not 0 <= position < self.count:
+            return f"ID {search} not found."
+        return self.read(position)
+
+    def __iter__(self):
+        for position in range(self.count):
+            yield self.read(position)
+
+    def close(self):
+        self._mm.close()
+
+class PositionMap(Mapping):
+    """index_to_docstore_id for MmapDocstore: vector position i maps to docstore position i."""
+    def __init__(self, count: int):
+        self.count = count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise KeyError(i)
+        return int(i)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(range(self.count))
@@ -0,0 +1,134 @@
+# utils/doctor_directory.py
+"""
+Structured doctor directory built at ingest time.
+Doctor records are parsed out of page text once, stored alongside the index manifest,
+and searched through a small specialization/name keyword index so most doctor
+queries never reach the LLM.
+"""
+import re
+from typing import Dict, Iterable, List, Optional
+
+RECORD_FIELDS = ("name", "specialization", "experience_years", "fee", "available_times")
+
+_DOCTOR_NAME = re.compile(r"\b(Dr\.?\s+[A-Z][\w.'-]*(?:\s+[A-Z][\w.'-]*){0,3})")
+_FIELD_PATTERNS = {
+    "specialization": re.compile(r"(?:speciali[sz]ation|specialty|speciality|department)[ \t]*[:\-][ \t]*([^\n]+)", re.I),
+    "experience_years": re.compile(r"experience[ \t]*[:\-][ \t]*(\d+)", re.I),
+    "fee": re.compile(r"(?:consultation\s+)?fees?[ \t]*[:\-][ \t]*([^\n]+)", re.I),
+    "available_times": re.compile(r"(?:available(?:\s+(?:times|timings|slots))?|timings?|slots?)[ \t]*[:\-][ \t]*([^\n]+)", re.I),
+}
+_TIME = re.compile(r"\b(\d{1,2})[:.](\d{2})\s*(am|pm)?", re.I)
+
+# words that say "I want a doctor" but nothing about which one
+STOPWORDS = {
+    "a", "an", "the", "i", "me", "my", "for", "to", "of", "with", "in", "and", "or", "is", "am", "have",
+    "need", "want", "looking", "find", "search", "suggest", "recommend", "show", "any", "some", "good",
+    "best", "please", "can", "you", "who", "which", "doctor", "doctors", "dr", "physician", "specialist",
+    "consultant", "available", "book", "appointment",
+}
+
+# symptom words -> specialization stems they point to (stem() of the specialization word)
+SYMPTOM_SPECIALIZATIONS = {
+    "skin": "dermat", "rash": "dermat", "acne": "dermat", "hair": "dermat", "itch": "dermat", "eczema": "dermat",
+    "bone": "orthoped", "joint": "orthoped", "fracture": "orthoped", "knee": "orthoped", "back": "orthoped",
+    "spine": "orthoped", "sprain": "orthoped", "shoulder": "orthoped",
+    "fever": "general", "cold": "general", "cough": "general", "flu": "general", "checkup": "general",
+    "headache": "general", "infection": "general",
+    "heart": "cardi", "chest": "cardi", "blood": "cardi", "palpitation": "cardi",
+    "child": "pediatr", "baby": "pediatr", "kid": "pediatr",
+    "tooth": "dent", "teeth": "dent", "eye": "ophthalm", "vision": "ophthalm",
+}
+
+_SUFFIXES = ("ological", "ologist", "ologists", "ology", "icians", "ician", "ists", "ist", "ics", "ic", "es", "s", "e")
+
+def stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[: -len(suffix)]
+    return word
+
+_SYMPTOM_STEMS = {stem(word): spec for word, spec in SYMPTOM_SPECIALIZATIONS.items()}
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in re.findall(r"[a-z]+", text.lower()) if w not in STOPWORDS]
+
+def _parse_times(text: str) -> List[str]:
+    times = []
+    for hour, minute, meridiem in _TIME.findall(text):
+        h = int(hour) % 12 + (12 if meridiem.lower() == "pm" else 0) if meridiem else int(hour)
+        times.append(f"{h:02d}:{minute}")
+    return times
+
+def parse_doctor_records(text: str) -> List[Dict]:
+    """Extract doctor records from directory-style text ("Dr. X" followed by labelled fields)."""
+    records = []
+    matches = list(_DOCTOR_NAME.finditer(text))
+    for i, match in enumerate(matches):
+        block_end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        block = text[match.end():block_end]
+        record = {"name": " ".join(match.group(1).split()), "specialization": "", "experience_years": "", "fee": "", "available_times": []}
+        for field, pattern in _FIELD_PATTERNS.items():
+            found = pattern.search(block)
+            if not found:
+                continue
+            value = found.group(1).strip()
+            if field == "experience_years":
+                record[field] = int(value)
+            elif field == "available_times":
+                record[field] = _parse_times(value)
+            else:
+                record[field] = value
+        # a bare "Dr. X" mention in prose is not a directory entry
+        if record["specialization"]:
+            records.append(record)
+    return records
+
+class DoctorDirectory:
+    """In-memory doctor table with an inverted index from name/specialization stems to rows."""
+    def __init__(self, records: Iterable[Dict] = ()):
+        self.records: List[Dict] = []
+        self._names = set()
+        self._index: Dict[str, set] = {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record: Dict):
+        key = record["name"].lower()
+        if key in self._names:
+            return
+        self._names.add(key)
+        row = len(self.records)
+        self.records.append({field: record.get(field, "") for field in RECORD_FIELDS})
+        for token in tokenize(record["name"]):
+            self._index.setdefault(("name", token), set()).add(row)
+        for token in tokenize(record.get("specialization", "")):
+            self._index.setdefault(("spec", stem(token)), set()).add(row)
+
+    def __len__(self):
+        return len(self.records)
+
+    def search(self, query: str, limit: int = 3) -> Optional[List[Dict]]:
+        """
+        Ranked matches for a doctor query, or None when the query has informative words
+        that match nothing (an ambiguous symptom the caller should hand to the LLM).
+        A query with no informative words ("find me a doctor") lists the directory.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return [dict(r) for r in self.records[:limit]]
+        scores: Dict[int, int] = {}
+        for token in tokens:
+            for row in self._index.get(("name", token), ()):
+                scores[row] = scores.get(row, 0) + 3
+            stems = {stem(token)}
+            # short plurals ("kids", "eyes") are below stem()'s length guard
+            symptom = _SYMPTOM_STEMS.get(stem(token)) or (token.endswith("s") and _SYMPTOM_STEMS.get(stem(token[:-1])))
+            if symptom:
+                stems.add(symptom)
+            for s in stems:
+                for row in self._index.get(("spec", s), ()):
+                    scores[row] = scores.get(row, 0) + 2
+        if not scores:
+            return None
+        ranked = sorted(scores, key=lambda row: (-scores[row], row))
+        return [dict(self.records[row]) for row in ranked[:limit]]
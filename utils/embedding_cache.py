@@ -0,0 +1,128 @@
+# utils/embedding_cache.py
+"""
+Persistent on-disk embedding cache keyed by (model name, chunk content hash).
+Backed by SQLite so it survives restarts and can be shared by several processes.
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(".cache", "embeddings.sqlite"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    SQLite table of float32 vectors with least-recently-used eviction once
+    max_entries is exceeded. Tracks hit/miss counters for the current process.
+    """
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, hash TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> Dict[str, List[float]]:
+        found = {}
+        if not hashes:
+            return found
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            # stay well below SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for h, blob in rows:
+                    vec = array("f")
+                    vec.frombytes(blob)
+                    found[h] = vec.tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND hash = ?",
+                    [(now, model, h) for h in found],
+                )
+                self._conn.commit()
+            self.hits += sum(1 for h in hashes if h in found)
+            self.misses += sum(1 for h in hashes if h not in found)
+        return found
+
+    def get(self, model: str, h: str) -> Optional[List[float]]:
+        return self.get_many(model, [h]).get(h)
+
+    def put_many(self, model: str, items: Dict[str, Sequence[float]]):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model, h, array("f", vec).tobytes(), now) for h, vec in items.items()],
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            # evict a little extra so we don't run this on every insert near the limit
+            overflow += self.max_entries // 20
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (overflow,),
+            )
+
+    def __len__(self):
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return count
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache instance at EMBEDDING_CACHE_PATH."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = EmbeddingCache()
+    return _default_cache
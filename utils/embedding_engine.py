@@ -0,0 +1,129 @@
+# utils/embedding_engine.py
+"""
+Batched, concurrent embedding stage for ingest.
+Texts are split into batches and sent through a bounded thread pool. Rate-limit
+(429 / quota) errors shrink the allowed concurrency and are retried with jittered
+exponential backoff; sustained success grows concurrency back up to max_workers.
+"""
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Sequence
+
+DEFAULT_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+DEFAULT_MAX_WORKERS = int(os.getenv("EMBED_MAX_WORKERS", "4"))
+
+_RATE_LIMIT_MARKERS = ("429", "resource exhausted", "resourceexhausted", "quota", "rate limit", "too many requests")
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    text = f"{type(exc).__name__} {exc}".lower()
+    return any(marker in text for marker in _RATE_LIMIT_MARKERS)
+
+def _is_transient_error(exc: Exception) -> bool:
+    return isinstance(exc, (ConnectionError, TimeoutError)) or "503" in str(exc) or "unavailable" in str(exc).lower()
+
+class AdaptiveLimiter:
+    """Concurrency limiter with additive increase / multiplicative decrease."""
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, rate_limited: bool = False):
+        with self._cond:
+            self.in_flight -= 1
+            if rate_limited:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self.limit < self.max_limit and self._successes >= self.limit:
+                    self.limit += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+class EmbeddingEngine:
+    """
+    Embed many texts with an `Embeddings`-like object (anything with embed_documents).
+    progress, if given, is called as progress(done, total) after every finished batch.
+    """
+    def __init__(
+        self,
+        embeddings,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        self.embeddings = embeddings
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.progress = progress
+        self.limiter = AdaptiveLimiter(self.max_workers)
+        self.retries = 0
+        self.rate_limited = 0
+
+    def _backoff(self, attempt: int):
+        # full jitter: spreads retries from all workers so they don't hit the quota together
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        time.sleep(random.uniform(0, delay))
+
+    def _embed_batch(self, batch: Sequence[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            rate_limited = False
+            try:
+                return self.embeddings.embed_documents(list(batch))
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                if attempt >= self.max_retries or not (rate_limited or _is_transient_error(e)):
+                    raise
+                if rate_limited:
+                    self.rate_limited += 1
+            finally:
+                self.limiter.release(rate_limited=rate_limited)
+            self.retries += 1
+            self._backoff(attempt)
+            attempt += 1
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        texts = list(texts)
+        total = len(texts)
+        if not total:
+            return []
+        batches = [texts[i:i + self.batch_size] for i in range(0, total, self.batch_size)]
+        results: List[Optional[List[List[float]]]] = [None] * len(batches)
+        done = 0
+        if len(batches) == 1 or self.max_workers == 1:
+            for i, batch in enumerate(batches):
+                results[i] = self._embed_batch(batch)
+                done += len(batch)
+                if self.progress:
+                    self.progress(done, total)
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {pool.submit(self._embed_batch, batch): i for i, batch in enumerate(batches)}
+                # progress is reported from the calling thread (Streamlit widgets require it)
+                for future in as_completed(futures):
+                    i = futures[future]
+                    results[i] = future.result()
+                    done += len(batches[i])
+                    if self.progress:
+                        self.progress(done, total)
+        return [vec for batch in results for vec in batch]
@@ -0,0 +1,156 @@
+# utils/faq_engine.py
+"""
+FAQ matcher with an inverted index over TF-IDF weighted word and character n-gram
+features. Scoring a question is one NumPy bincount over the postings of its
+features, so cost grows with the question's features rather than the number of FAQs.
+"""
+import csv
+import json
+import math
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from models.booking import FAQ
+
+DEFAULT_THRESHOLD = 0.6
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "be", "do", "does", "did", "of", "to", "in", "on", "for", "and",
+    "or", "at", "by", "with", "i", "me", "my", "you", "your", "we", "our", "it", "this", "that", "can",
+    "could", "please", "tell", "what", "whats", "how", "which", "there", "any",
+}
+
+def _features(text: str) -> Dict[str, int]:
+    """Term counts: whole words plus character trigrams of each word (robust to typos and inflections)."""
+    counts: Dict[str, int] = {}
+    for word in _WORD.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        counts["w:" + word] = counts.get("w:" + word, 0) + 1
+        padded = f"<{word}>"
+        for i in range(len(padded) - 2):
+            gram = "c:" + padded[i:i + 3]
+            counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+class FAQEngine:
+    """
+    Add FAQs one at a time or in bulk. Features are interned into a vocabulary as FAQs are
+    loaded; the TF-IDF postings (CSR arrays sorted by term) are rebuilt with NumPy on the
+    first match after a change.
+    """
+    def __init__(self, faqs: Iterable[FAQ] = (), threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.faqs: List[FAQ] = []
+        self._vocab: Dict[str, int] = {}
+        # one entry per (faq, term) pair, appended on load
+        self._pair_rows: List[int] = []
+        self._pair_terms: List[int] = []
+        self._pair_tfs: List[int] = []
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._rows = np.zeros(0, dtype=np.int32)
+        self._weights = np.zeros(0, dtype=np.float32)
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load(faqs)
+
+    def __len__(self):
+        return len(self.faqs)
+
+    def add(self, question: str, answer: str):
+        self.load([FAQ(question, answer)])
+
+    def load(self, items: Iterable[Union[FAQ, Tuple[str, str], dict]]):
+        """Bulk-add FAQs given as FAQ objects, (question, answer) pairs or {"question", "answer"} dicts."""
+        with self._lock:
+            for item in items:
+                if isinstance(item, dict):
+                    item = FAQ(item["question"], item["answer"])
+                elif not isinstance(item, FAQ):
+                    item = FAQ(*item)
+                row = len(self.faqs)
+                self.faqs.append(item)
+                for term, tf in _features(item.question).items():
+                    self._pair_rows.append(row)
+                    self._pair_terms.append(self._vocab.setdefault(term, len(self._vocab)))
+                    self._pair_tfs.append(tf)
+                self._dirty = True
+
+    def load_file(self, path: str):
+        """Bulk-load a JSON list of {"question", "answer"} objects or a CSV with question,answer columns."""
+        if path.lower().endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                self.load(json.load(f))
+        else:
+            with open(path, newline="", encoding="utf-8") as f:
+                self.load(csv.DictReader(f))
+
+    def _build(self):
+        n, n_terms = len(self.faqs), len(self._vocab)
+        rows = np.asarray(self._pair_rows, dtype=np.int32)
+        terms = np.asarray(self._pair_terms, dtype=np.int64)
+        tfs = np.asarray(self._pair_tfs, dtype=np.float32)
+        df = np.bincount(terms, minlength=n_terms)
+        self._idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+        weights = (1 + np.log(tfs)) * self._idf[terms]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n))
+        weights /= np.where(norms > 0, norms, 1)[rows]
+        order = np.argsort(terms, kind="stable")
+        self._rows = rows[order]
+        self._weights = weights[order].astype(np.float32)
+        self._indptr = np.concatenate([[0], np.cumsum(df)])
+        self._dirty = False
+
+    def scores(self, question: str) -> np.ndarray:
+        """Cosine similarity of the question against every FAQ question."""
+        with self._lock:
+            if self._dirty:
+                self._build()
+            n = len(self.faqs)
+            query = {}
+            # terms no FAQ contains still count towards the query norm (at the idf of a term
+            # seen in no document), so an unrelated question can't score as an exact match
+            unknown_idf = math.log(1 + n) + 1
+            unknown = 0.0
+            for term, tf in _features(question).items():
+                tid = self._vocab.get(term)
+                if tid is None:
+                    unknown += ((1 + math.log(tf)) * unknown_idf) ** 2
+                else:
+                    query[tid] = (1 + math.log(tf)) * self._idf[tid]
+            if not n or not query:
+                return np.zeros(n, dtype=np.float32)
+            norm = math.sqrt(sum(v * v for v in query.values()) + unknown)
+            slices = [slice(self._indptr[t], self._indptr[t + 1]) for t in query]
+            rows = np.concatenate([self._rows[sl] for sl in slices])
+            weights = np.concatenate([self._weights[sl] * (query[t] / norm) for t, sl in zip(query, slices)])
+        return np.bincount(rows, weights=weights, minlength=n)
+
+    def match(self, question: str) -> Optional[Tuple[FAQ, float]]:
+        """Best FAQ and its score, or None below the confidence threshold."""
+        if not question:
+            return None
+        scores = self.scores(question)
+        if not len(scores):
+            return None
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return self.faqs[best], float(scores[best])
+
+    def match_many(self, questions: Iterable[str]) -> List[Optional[Tuple[FAQ, float]]]:
+        """match() for a batch of questions; repeated questions are scored once."""
+        found: Dict[str, Optional[Tuple[FAQ, float]]] = {}
+        results = []
+        for question in questions:
+            if question not in found:
+                found[question] = self.match(question)
+            results.append(found[question])
+        return results
+
+    def answer(self, question: str) -> Optional[str]:
+        found = self.match(question)
+        return found[0].answer if found else None
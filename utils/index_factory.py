@@ -0,0 +1,123 @@
+# utils/index_factory.py
+"""
+Configurable FAISS index construction and loading.
+Supports exact flat search plus IVF-Flat, HNSW and IVF-PQ for large corpora, trained
+on a sample of the vectors, with tunable nprobe / efSearch. Indexes are read
+memory-mapped so several worker processes can share one copy in the page cache.
+"""
+import math
+import os
+import numpy as np
+import faiss
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+DEFAULT_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")
+DEFAULT_NPROBE = int(os.getenv("FAISS_NPROBE", "16"))
+DEFAULT_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "64"))
+HNSW_M = 32
+TRAIN_SAMPLE_SIZE = int(os.getenv("FAISS_TRAIN_SAMPLE", "100000"))
+# faiss k-means wants ~39 training points per centroid
+_POINTS_PER_CENTROID = 39
+# retrain an IVF index once the sizing rule asks for this many times its current nlist
+NLIST_GROWTH_FACTOR = 2
+
+def _nlist(n: int) -> int:
+    return min(int(4 * math.sqrt(n)), n // _POINTS_PER_CENTROID)
+
+def factory_string(kind: str, dim: int, n: int) -> str:
+    """faiss.index_factory description for `kind` sized for n vectors; falls back to Flat when n is too small to train."""
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS index type: {kind}. Expected one of {INDEX_TYPES}")
+    if kind == "hnsw":
+        return f"HNSW{HNSW_M}"
+    if kind in ("ivf_flat", "ivf_pq"):
+        nlist = _nlist(n)
+        if nlist < 4:
+            return "Flat"
+        if kind == "ivf_flat":
+            return f"IVF{nlist},Flat"
+        # largest sub-quantizer count that divides dim, ~8 dims per code
+        m = next(m for m in (64, 48, 32, 24, 16, 12, 8, 4, 2, 1) if dim % m == 0 and m <= max(1, dim // 8))
+        nbits = 8 if n >= 256 * _POINTS_PER_CENTROID else 4
+        if n < (1 << nbits) * _POINTS_PER_CENTROID:
+            return f"IVF{nlist},Flat"
+        return f"IVF{nlist},PQ{m}x{nbits}"
+    return "Flat"
+
+def build_index(vectors: np.ndarray, kind: str = DEFAULT_INDEX_TYPE, sample_size: int = TRAIN_SAMPLE_SIZE):
+    """Create an index of the requested type, train it on a random sample of vectors and add them all."""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+    index = faiss.index_factory(dim, factory_string(kind, dim, n), faiss.METRIC_L2)
+    if not index.is_trained:
+        rng = np.random.default_rng(0)
+        sample = vectors if n <= sample_size else vectors[rng.choice(n, sample_size, replace=False)]
+        index.train(sample)
+    index.add(vectors)
+    tune(index)
+    return index
+
+def tune(index, nprobe: int = DEFAULT_NPROBE, ef_search: int = DEFAULT_EF_SEARCH):
+    """Apply search-time parameters; a no-op for flat indexes."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    hnsw = getattr(faiss.downcast_index(index), "hnsw", None)
+    if hnsw is not None:
+        hnsw.efSearch = ef_search
+    return index
+
+def index_kind(index) -> str:
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf_flat"
+    return "flat"
+
+def _factory_kind(description: str) -> str:
+    """Index kind a factory_string() description builds."""
+    if description.startswith("HNSW"):
+        return "hnsw"
+    if description.startswith("IVF"):
+        return "ivf_pq" if ",PQ" in description else "ivf_flat"
+    return "flat"
+
+def needs_rebuild(index, kind: str = DEFAULT_INDEX_TYPE) -> bool:
+    """
+    True when ``index`` should be rebuilt as ``kind``: build_index would now pick another
+    type for its ntotal (small corpora fall back from IVF / PQ to simpler indexes, and move
+    up once they are big enough to train), or it is IVF and has grown enough that its nlist
+    is far below what the sizing rule picks for the current ntotal.
+    """
+    if index_kind(index) != _factory_kind(factory_string(kind, index.d, index.ntotal)):
+        return True
+    ivf = faiss.try_extract_index_ivf(index)
+    return ivf is not None and _nlist(index.ntotal) >= NLIST_GROWTH_FACTOR * ivf.nlist
+
+def is_lossy(index) -> bool:
+    """True when stored vectors can only be reconstructed approximately (product quantization)."""
+    return index_kind(index) == "ivf_pq"
+
+def supports_remove(index) -> bool:
+    """True when index.remove_ids renumbers the remaining vectors, which the LangChain wrapper assumes."""
+    return index_kind(index) == "flat"
+
+def reconstruct_all(index) -> np.ndarray:
+    """All stored vectors in id order (approximate for PQ)."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+def read_index(path: str, mmap: bool = True):
+    """Read an index, memory-mapped and read-only when mmap=True."""
+    if mmap:
+        try:
+            return tune(faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY))
+        except RuntimeError:
+            # some index types can't be mapped; fall back to a normal read
+            pass
+    return tune(faiss.read_index(path))
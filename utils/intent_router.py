@@ -0,0 +1,249 @@
+# utils/intent_router.py
+"""
+Local intent router for chat turns, so only real questions reach the RAG / LLM path.
+
+1. a precompiled keyword automaton (one regex with a named group per intent) answers
+   whole-message small talk (greetings, thanks, goodbyes, yes/no, help) and spots
+   booking / doctor vocabulary on word boundaries;
+2. a nearest-centroid classifier over hashed word and character n-gram vectors of a
+   few example phrases per intent settles everything else. Phrase vectors are built
+   once and message vectors are cached, so routing is a sparse dot product.
+
+Trivial turns get a canned or templated reply, FAQ matches are answered from the
+local FAQ engine, and every decision is counted so stats() / render_prometheus()
+show how many LLM calls the router saved.
+"""
+import os
+import re
+import zlib
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from utils.tracing import span
+
+GREETING, THANKS, GOODBYE, YES, NO, HELP = "greeting", "thanks", "goodbye", "yes", "no", "help"
+BOOKING, DOCTOR_SEARCH, FAQ, QUESTION = "booking", "doctor_search", "faq", "question"
+
+SMALL_TALK = (GREETING, THANKS, GOODBYE, YES, NO, HELP)
+# intents whose handler may call the LLM; everything else is answered locally
+LLM_INTENTS = (DOCTOR_SEARCH, QUESTION)
+
+ROUTE_THRESHOLD = float(os.getenv("INTENT_ROUTE_THRESHOLD", "0.3"))
+SMALL_TALK_THRESHOLD = 0.6
+SMALL_TALK_MAX_WORDS = 6
+KEYWORD_BOOST = 0.3
+DIM = 1 << 12
+
+_SMALL_TALK_PATTERNS = {
+    GREETING: r"(?:hi|hello|hey|hiya|howdy|greetings|good (?:morning|afternoon|evening))(?: there| (?:bot|assistant))?",
+    THANKS: r"(?:thanks?(?: you)?|thank you(?: so much| very much)?|thx|ty|cheers|(?:i )?appreciate it|great thanks?)",
+    GOODBYE: r"(?:bye|goodbye|bye bye|see (?:you|ya)(?: later)?|that'?s all|nothing else)",
+    YES: r"(?:y|yes|yeah|yep|yup|sure|ok|okay|of course|please do|go ahead|sounds good|yes please|correct)",
+    NO: r"(?:n|no|nope|nah|no thanks?|no thank you|not now|maybe later|never ?mind|cancel)",
+    HELP: r"(?:help|what can you do|how does this work|what can i ask(?: you)?)",
+}
+# when phrases combine ("ok thanks", "no thanks, bye") the answer to a pending yes/no question wins
+SMALL_TALK_PRIORITY = (NO, YES, GOODBYE, THANKS, HELP, GREETING)
+_SMALL_TALK_PHRASE = r"(?:" + "|".join(_SMALL_TALK_PATTERNS.values()) + r")\b"
+# whole message made of one or more small-talk phrases, ignoring punctuation, emoji and "and"
+_SMALL_TALK = re.compile(rf"^\W*{_SMALL_TALK_PHRASE}(?:\W+(?:and\W+)?{_SMALL_TALK_PHRASE})*\W*$")
+_SMALL_TALK_PARTS = re.compile(
+    r"\b(?:" + "|".join(f"(?P<{intent}>{pattern})" for intent, pattern in _SMALL_TALK_PATTERNS.items()) + r")\b"
+)
+# a greeting in front of a real message ("hi, what are the clinic hours?") is dropped before routing
+_LEADING_GREETING = re.compile(r"^\W*(?:" + _SMALL_TALK_PATTERNS[GREETING] + r")\b[\s,!.]*")
+_KEYWORDS = re.compile(
+    r"\b(?:(?P<booking>book(?:ing)?|appointments?|reserv(?:e|ation)|re-?schedule|schedule|slots?)"
+    r"|(?P<doctor_search>doctors?|dr|physicians?|specialists?|surgeons?|dentists?|pediatricians?|gp"
+    r"|\w+olog(?:ist|y)|\w+iatrist))\b"
+)
+_WORD = re.compile(r"[a-z0-9']+")
+
+EXAMPLES = {
+    GREETING: ["hi", "hello", "hey there", "good morning", "hello how are you", "hi assistant"],
+    THANKS: ["thank you", "thanks a lot", "thank you so much", "appreciate it", "that was helpful thanks"],
+    GOODBYE: ["bye", "goodbye", "see you later", "that is all for now", "nothing else bye"],
+    YES: ["yes", "yeah sure", "ok", "okay please", "yes please", "sounds good", "go ahead"],
+    NO: ["no", "nope", "no thanks", "not now", "maybe later", "no thank you"],
+    HELP: ["what can you do", "help me", "how does this work", "what can i ask you"],
+    BOOKING: [
+        "i want to book an appointment", "schedule a visit", "reserve a slot with the doctor",
+        "can i get an appointment tomorrow", "book a consultation", "i need to make a reservation",
+        "reschedule my appointment",
+    ],
+    DOCTOR_SEARCH: [
+        "find me a cardiologist", "which doctor treats skin rash", "i need a specialist for knee pain",
+        "recommend a doctor for fever", "who is the best dermatologist", "suggest a physician for back pain",
+        "i have chest pain who should i see", "doctor for my child's cough",
+        "my son has a fever who should we see", "which specialist should i see for headaches",
+    ],
+    QUESTION: [
+        "what are the clinic hours", "what does the policy say about refunds", "how do i prepare for a blood test",
+        "what is the consultation fee", "explain the insurance claim process", "what documents do i need to bring",
+        "is parking available at the hospital", "how long does a lab report take",
+    ],
+}
+
+REPLIES = {
+    GREETING: "Hello! I can answer questions about the clinic, help you find a doctor, or book an appointment. How can I help?",
+    THANKS: "You're welcome! Is there anything else I can help you with?",
+    GOODBYE: "Goodbye! Take care.",
+    YES: "Great, what would you like to do next? You can ask a question, look for a doctor, or book an appointment.",
+    NO: "No problem. Let me know if you need anything else.",
+    HELP: (
+        "I can answer questions from the uploaded documents, suggest doctors for your symptoms or a "
+        "specialization, and book appointments. Try \"find a cardiologist\" or \"book an appointment\"."
+    ),
+}
+
+class Route(NamedTuple):
+    intent: str
+    source: str           # "keyword", "classifier", "faq" or "fallback"
+    score: float
+    reply: Optional[str]  # canned / templated answer, None when a handler must run
+    text: str             # the message the handler should see (leading greeting removed)
+
+    @property
+    def uses_llm(self) -> bool:
+        return self.intent in LLM_INTENTS
+
+def _features(text: str) -> List[str]:
+    words = _WORD.findall(text.lower())
+    features = [f"w:{w}" for w in words]
+    features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return features
+
+@lru_cache(maxsize=4096)
+def _vectorize(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashed, L2-normalized sparse vector of ``text`` as (indices, values)."""
+    counts = Counter(zlib.crc32(f.encode("utf-8")) % DIM for f in _features(text))
+    if not counts:
+        return np.zeros(0, np.int64), np.zeros(0, np.float32)
+    idx = np.fromiter(counts.keys(), np.int64, len(counts))
+    values = 1 + np.log(np.fromiter(counts.values(), np.float32, len(counts)))
+    return idx, values / np.linalg.norm(values)
+
+class IntentRouter:
+    """
+    route(message) -> Route. ``faq_match`` (e.g. booking_utils.match_faq) lets plain
+    questions be answered from the FAQ engine before falling back to RAG.
+    """
+    def __init__(self, faq_match: Optional[Callable[[str], Optional[tuple]]] = None,
+                 examples: Dict[str, List[str]] = EXAMPLES, threshold: float = ROUTE_THRESHOLD):
+        self.faq_match = faq_match
+        self.threshold = threshold
+        self.intents = list(examples)
+        centroids = np.zeros((len(self.intents), DIM), np.float32)
+        for row, intent in enumerate(self.intents):
+            for phrase in examples[intent]:
+                idx, values = _vectorize(phrase)
+                np.add.at(centroids[row], idx, values)
+            centroids[row] /= np.linalg.norm(centroids[row]) or 1.0
+        self._centroids = centroids
+        self._lock = threading.Lock()
+        self._decisions: Counter = Counter()  # (intent, source) -> count
+        self._llm_calls_saved = 0
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Cosine similarity of ``text`` to each intent centroid."""
+        idx, values = _vectorize(text)
+        sims = self._centroids[:, idx] @ values if len(idx) else np.zeros(len(self.intents))
+        return dict(zip(self.intents, sims.tolist()))
+
+    def _classify(self, text: str) -> Route:
+        lowered = text.lower()
+        if _SMALL_TALK.match(lowered):
+            found = {m.lastgroup for m in _SMALL_TALK_PARTS.finditer(lowered)}
+            intent = next(i for i in SMALL_TALK_PRIORITY if i in found)
+            return Route(intent, "keyword", 1.0, REPLIES[intent], text)
+        stripped = _LEADING_GREETING.sub("", text, count=1) or text
+        lowered = stripped.lower()
+        scores = self.scores(lowered)
+        for m in _KEYWORDS.finditer(lowered):
+            scores[m.lastgroup] += KEYWORD_BOOST
+        short = len(_WORD.findall(lowered)) <= SMALL_TALK_MAX_WORDS
+        intent = max(scores, key=scores.get)
+        score = scores[intent]
+        if intent in SMALL_TALK:
+            if short and score >= SMALL_TALK_THRESHOLD:
+                return Route(intent, "classifier", score, REPLIES[intent], stripped)
+            # too long or too unsure to be small talk: decide between the real handlers
+            intent = max((BOOKING, DOCTOR_SEARCH, QUESTION), key=scores.get)
+            score = scores[intent]
+        if intent in (BOOKING, DOCTOR_SEARCH) and score >= self.threshold:
+            return Route(intent, "classifier", score, None, stripped)
+        if self.faq_match is not None:
+            found = self.faq_match(stripped)
+            if found:
+                faq, confidence = found
+                return Route(FAQ, "faq", float(confidence), faq.answer, stripped)
+        return Route(QUESTION, "classifier" if intent == QUESTION else "fallback", score, None, stripped)
+
+    def route(self, message: str) -> Route:
+        with span("router.route"):
+            route = self._classify(message or "")
+        with self._lock:
+            self._decisions[(route.intent, route.source)] += 1
+            # before the router every turn outside the booking flow went to doctor search or RAG
+            if not route.uses_llm and route.intent != BOOKING:
+                self._llm_calls_saved += 1
+        return route
+
+    def stats(self) -> Dict:
+        with self._lock:
+            decisions = dict(self._decisions)
+            saved = self._llm_calls_saved
+        by_intent: Counter = Counter()
+        by_source: Counter = Counter()
+        for (intent, source), n in decisions.items():
+            by_intent[intent] += n
+            by_source[source] += n
+        total = sum(by_intent.values())
+        routed_to_llm = sum(by_intent[i] for i in LLM_INTENTS)
+        return {
+            "total": total,
+            "by_intent": dict(by_intent),
+            "by_source": dict(by_source),
+            "routed_to_llm": routed_to_llm,
+            "llm_calls_saved": saved,
+            "llm_call_rate": routed_to_llm / total if total else 0.0,
+        }
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            decisions = sorted(self._decisions.items())
+            saved = self._llm_calls_saved
+        lines = [
+            "# HELP router_decisions_total Chat turns routed, by intent and decision source.",
+            "# TYPE router_decisions_total counter",
+        ]
+        lines += [f'router_decisions_total{{intent="{i}",source="{s}"}} {n}' for (i, s), n in decisions]
+        lines += [
+            "# HELP router_llm_calls_saved_total Turns answered locally instead of by the RAG/LLM path.",
+            "# TYPE router_llm_calls_saved_total counter",
+            f"router_llm_calls_saved_total {saved}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def reset_stats(self):
+        with self._lock:
+            self._decisions.clear()
+            self._llm_calls_saved = 0
+
+_default_router = None
+_default_router_lock = threading.Lock()
+
+def get_intent_router() -> IntentRouter:
+    """Process-wide router answering FAQ matches from booking_utils' FAQ engine."""
+    global _default_router
+    if _default_router is None:
+        with _default_router_lock:
+            if _default_router is None:
+                from utils.booking_utils import match_faq
+                _default_router = IntentRouter(faq_match=match_faq)
+    return _default_router
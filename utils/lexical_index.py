@@ -0,0 +1,143 @@
+# utils/lexical_index.py
+"""
+Local BM25 index over chunk text, kept next to the FAISS index.
+Keyed by the same chunk ids as the vector store, so results can be fused with
+vector search (reciprocal rank fusion) or used alone for short keyword queries
+without an embedding round trip.
+"""
+import json
+import math
+import os
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "be", "of", "to", "in", "on", "for", "and", "or", "at", "by",
+    "with", "what", "which", "who", "how", "do", "does", "i", "me", "my", "you", "your", "it", "this", "that",
+    "can", "please", "tell", "about",
+}
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+
+class BM25Index:
+    """Inverted index with Okapi BM25 scoring. Postings map term -> {doc position: term frequency}."""
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []       # position -> chunk id ("" for removed slots)
+        self.lengths: List[int] = []   # position -> token count (0 for removed slots)
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self._positions: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, chunk_id):
+        return chunk_id in self._positions
+
+    def add(self, chunk_id: str, text: str):
+        if chunk_id in self._positions:
+            return
+        tokens = tokenize(text)
+        pos = len(self.ids)
+        self.ids.append(chunk_id)
+        self.lengths.append(len(tokens))
+        self._positions[chunk_id] = pos
+        self._total_length += len(tokens)
+        for token in tokens:
+            postings = self.postings.setdefault(token, {})
+            postings[pos] = postings.get(pos, 0) + 1
+
+    def add_many(self, items: Iterable[Tuple[str, str]]):
+        for chunk_id, text in items:
+            self.add(chunk_id, text)
+
+    def remove(self, chunk_ids: Iterable[str]):
+        removed = set()
+        for chunk_id in chunk_ids:
+            pos = self._positions.pop(chunk_id, None)
+            if pos is None:
+                continue
+            removed.add(pos)
+            self._total_length -= self.lengths[pos]
+            self.ids[pos] = ""
+            self.lengths[pos] = 0
+        if not removed:
+            return
+        for term in list(self.postings):
+            postings = self.postings[term]
+            for pos in removed.intersection(postings):
+                del postings[pos]
+            if not postings:
+                del self.postings[term]
+        # compact once removed slots dominate so positions don't grow without bound
+        if len(self.ids) > 2 * len(self._positions) + 64:
+            self._compact()
+
+    def _compact(self):
+        remap = {}
+        ids, lengths = [], []
+        for pos, chunk_id in enumerate(self.ids):
+            if chunk_id:
+                remap[pos] = len(ids)
+                ids.append(chunk_id)
+                lengths.append(self.lengths[pos])
+        self.ids, self.lengths = ids, lengths
+        self._positions = {chunk_id: pos for pos, chunk_id in enumerate(ids)}
+        self.postings = {term: {remap[p]: tf for p, tf in postings.items()} for term, postings in self.postings.items()}
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        n = len(self._positions)
+        if not n:
+            return []
+        avg_len = self._total_length / n or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for pos, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[pos] / avg_len)
+                scores[pos] = scores.get(pos, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda item: -item[1])[:k]
+        return [(self.ids[pos], score) for pos, score in best]
+
+    def save(self, path: str):
+        if len(self.ids) != len(self._positions):
+            self._compact()
+        data = {
+            "k1": self.k1,
+            "b": self.b,
+            "ids": self.ids,
+            "lengths": self.lengths,
+            # JSON keys must be strings; store postings as parallel lists
+            "postings": {term: [list(p.keys()), list(p.values())] for term, p in self.postings.items()},
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(data["k1"], data["b"])
+        index.ids = data["ids"]
+        index.lengths = data["lengths"]
+        index.postings = {term: dict(zip(positions, tfs)) for term, (positions, tfs) in data["postings"].items()}
+        index._positions = {chunk_id: pos for pos, chunk_id in enumerate(index.ids) if chunk_id}
+        index._total_length = sum(index.lengths)
+        return index
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[str]:
+    """Fuse ranked id lists: score(id) = sum over lists of 1 / (k + rank)."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda chunk_id: -scores[chunk_id])
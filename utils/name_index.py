@@ -0,0 +1,112 @@
+# utils/name_index.py
+"""
+Prebuilt doctor name lookup.
+Names are normalized once (case, accents, "Dr." title, punctuation) and indexed by
+full name, by token (with prefix lookups over a sorted vocabulary) and by character
+trigram for optional fuzzy matching. Results are ranked: exact name, then all query
+tokens matching whole tokens, then token prefixes, then fuzzy trigram similarity.
+"""
+import re
+import unicodedata
+from collections import Counter
+from bisect import bisect_left, insort
+from typing import Dict, Generic, Iterable, List, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_TITLES = {"dr", "doctor", "prof", "mr", "mrs", "ms"}
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+def normalize_name(name: str) -> List[str]:
+    folded = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+    return [t for t in _NON_WORD.split(folded) if t and t not in _TITLES]
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class NameIndex(Generic[T]):
+    """Name index over arbitrary items; key(item) gives the name to index."""
+    FUZZY_THRESHOLD = 0.3
+
+    def __init__(self, items: Iterable[T] = (), key=lambda item: item.name):
+        self.key = key
+        self.items: List[T] = []
+        self._gram_counts: List[int] = []
+        self._exact: Dict[str, List[int]] = {}
+        self._tokens: Dict[str, Set[int]] = {}
+        self._vocab: List[str] = []  # sorted, for prefix lookups
+        self._trigrams: Dict[str, Set[int]] = {}
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item: T):
+        """Index one more item; existing entries are untouched."""
+        tokens = normalize_name(self.key(item))
+        row = len(self.items)
+        self.items.append(item)
+        full = " ".join(tokens)
+        self._exact.setdefault(full, []).append(row)
+        for token in tokens:
+            if token not in self._tokens:
+                self._tokens[token] = set()
+                insort(self._vocab, token)
+            self._tokens[token].add(row)
+        grams = _trigrams(full)
+        self._gram_counts.append(len(grams))
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(row)
+
+    def _prefix_rows(self, prefix: str) -> Set[int]:
+        rows = set()
+        i = bisect_left(self._vocab, prefix)
+        while i < len(self._vocab) and self._vocab[i].startswith(prefix):
+            rows |= self._tokens[self._vocab[i]]
+            i += 1
+        return rows
+
+    def search(self, name: str, limit: int = 5, fuzzy: bool = True) -> List[Tuple[T, float]]:
+        """Ranked (item, score) matches, score in (0, 1]."""
+        tokens = normalize_name(name)
+        if not tokens:
+            return []
+        full = " ".join(tokens)
+        scores: Dict[int, float] = {row: 1.0 for row in self._exact.get(full, ())}
+
+        # every query token must match a whole token (0.9) or a token prefix (0.7)
+        candidates = None
+        token_scores: Dict[int, float] = {}
+        for token in tokens:
+            whole = self._tokens.get(token, set())
+            prefix = self._prefix_rows(token)
+            rows = whole | prefix
+            candidates = rows if candidates is None else candidates & rows
+            if not candidates:
+                break
+            for row in candidates:
+                token_scores[row] = token_scores.get(row, 0.0) + (0.9 if row in whole else 0.7)
+        for row in candidates or ():
+            scores.setdefault(row, token_scores[row] / len(tokens))
+
+        if fuzzy and len(scores) < limit:
+            query_grams = _trigrams(full)
+            overlap = Counter()
+            for gram in query_grams:
+                overlap.update(self._trigrams.get(gram, ()))
+            for row, shared in overlap.items():
+                if row in scores:
+                    continue
+                # Jaccard similarity of the trigram sets
+                similarity = shared / (len(query_grams) + self._gram_counts[row] - shared)
+                if similarity >= self.FUZZY_THRESHOLD:
+                    scores[row] = 0.6 * similarity
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(self.items[row], score) for row, score in ranked]
+
+    def best(self, name: str, fuzzy: bool = True):
+        results = self.search(name, limit=1, fuzzy=fuzzy)
+        return results[0][0] if results else None
@@ -0,0 +1,100 @@
+# utils/pdf_pipeline.py
+"""
+Streaming PDF extraction and chunking for ingest.
+Uploads are spooled to temp files, pages are extracted in a process pool in small
+page ranges, and pages stream into the splitter as they arrive. Only a bounded
+number of page ranges and one batch of chunks are held in memory at a time.
+"""
+import os
+import hashlib
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+from PyPDF2 import PdfReader
+
+DEFAULT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+PAGES_PER_TASK = 8
+# below this many pages a process pool costs more to start than it saves
+MIN_PAGES_FOR_POOL = 32
+
+class SpooledPdf(NamedTuple):
+    name: str
+    doc_id: str
+    path: str
+    num_pages: int
+
+class Page(NamedTuple):
+    source: str
+    doc_id: str
+    page: int  # 1-based
+    text: str
+
+def spool_upload(file, chunk_size: int = 1 << 20) -> Tuple[str, str]:
+    """Copy an upload to a temp file while hashing it. Returns (content sha256, temp path)."""
+    digest = hashlib.sha256()
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(fd, "wb") as out:
+        if hasattr(file, "seek"):
+            file.seek(0)
+        while True:
+            block = file.read(chunk_size)
+            if not block:
+                break
+            digest.update(block)
+            out.write(block)
+    return digest.hexdigest(), path
+
+def count_pages(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+def _extract_page_range(path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    # runs in a worker process; opens the file itself so no page data crosses the pipe twice
+    reader = PdfReader(path)
+    pages = []
+    for i in range(start, end):
+        text = reader.pages[i].extract_text()
+        if text:
+            pages.append((i + 1, text))
+    return pages
+
+def _tasks(pdfs: Iterable[SpooledPdf]):
+    for pdf in pdfs:
+        for start in range(0, pdf.num_pages, PAGES_PER_TASK):
+            yield pdf, start, min(start + PAGES_PER_TASK, pdf.num_pages)
+
+def iter_pdf_pages(pdfs: List[SpooledPdf], max_workers: int = DEFAULT_WORKERS) -> Iterator[Page]:
+    """Yield pages in document order, extracting up to 2*max_workers page ranges ahead."""
+    total_pages = sum(p.num_pages for p in pdfs)
+    if max_workers <= 1 or total_pages < MIN_PAGES_FOR_POOL:
+        for pdf, start, end in _tasks(pdfs):
+            for page_no, text in _extract_page_range(pdf.path, start, end):
+                yield Page(pdf.name, pdf.doc_id, page_no, text)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        tasks = _tasks(pdfs)
+        in_flight = deque()
+        for pdf, start, end in islice(tasks, 2 * max_workers):
+            in_flight.append((pdf, pool.submit(_extract_page_range, pdf.path, start, end)))
+        while in_flight:
+            pdf, future = in_flight.popleft()
+            for nxt_pdf, start, end in islice(tasks, 1):
+                in_flight.append((nxt_pdf, pool.submit(_extract_page_range, nxt_pdf.path, start, end)))
+            for page_no, text in future.result():
+                yield Page(pdf.name, pdf.doc_id, page_no, text)
+
+def iter_chunks(pages: Iterable[Page], splitter) -> Iterator[Tuple[str, dict]]:
+    """Split each page as it arrives; chunks carry source file, document hash and page number."""
+    for page in pages:
+        for chunk in splitter.split_text(page.text):
+            yield chunk, {"source": page.source, "doc_id": page.doc_id, "page": page.page}
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,187 @@
+# utils/query_cache.py
+"""
+Two-level answer cache for RAG queries:
+1. exact cache keyed by the normalized query text
+2. semantic cache that reuses an answer when the query embedding is within a
+   cosine-similarity threshold of a cached query
+Both levels have TTL and size eviction and are cleared whenever the index generation changes.
+"""
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional, Sequence
+import numpy as np
+
+DEFAULT_TTL = float(os.getenv("RAG_CACHE_TTL", "3600"))
+DEFAULT_SIZE = int(os.getenv("RAG_CACHE_SIZE", "1024"))
+DEFAULT_SEMANTIC_THRESHOLD = float(os.getenv("RAG_SEMANTIC_THRESHOLD", "0.95"))
+
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+def normalize_query(query: str) -> str:
+    return _SPACES.sub(" ", _PUNCT.sub(" ", query.lower())).strip()
+
+class TTLCache:
+    """Thread-safe LRU mapping with per-entry expiry (ttl=None disables expiry)."""
+    def __init__(self, max_size: int = DEFAULT_SIZE, ttl: Optional[float] = DEFAULT_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class SemanticCache:
+    """
+    Fixed-capacity matrix of unit-normalized query embeddings scored with one matrix-vector
+    product. When full, the least recently used row is overwritten.
+    """
+    def __init__(self, max_size: int = DEFAULT_SIZE, ttl: float = DEFAULT_TTL, threshold: float = DEFAULT_SEMANTIC_THRESHOLD):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._vectors = None
+        self._answers: List[Optional[str]] = [None] * self.max_size
+        self._expires = np.zeros(self.max_size)
+        self._last_used = np.zeros(self.max_size)
+        self._size = 0
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    @staticmethod
+    def _unit(vector: Sequence[float]) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def get(self, vector: Sequence[float]) -> Optional[str]:
+        with self._lock:
+            if not self._size:
+                return None
+            now = time.monotonic()
+            scores = self._vectors[:self._size] @ self._unit(vector)
+            scores[self._expires[:self._size] < now] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            self._last_used[best] = now
+            return self._answers[best]
+
+    def put(self, vector: Sequence[float], answer: str):
+        vec = self._unit(vector)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vec.shape[0]:
+                self._vectors = np.zeros((self.max_size, vec.shape[0]), dtype=np.float32)
+                self._size = 0
+            now = time.monotonic()
+            if self._size < self.max_size:
+                row = self._size
+                self._size += 1
+            else:
+                row = int(np.argmin(self._last_used))
+            self._vectors[row] = vec
+            self._answers[row] = answer
+            self._expires[row] = now + self.ttl
+            self._last_used[row] = now
+
+    def __len__(self):
+        return self._size
+
+class QueryCache:
+    """
+    Answer cache bound to an index generation. Query embeddings are kept in their own LRU,
+    which survives re-ingest since a query's embedding does not depend on the index.
+    """
+    def __init__(self, max_size: int = DEFAULT_SIZE, ttl: float = DEFAULT_TTL, threshold: float = DEFAULT_SEMANTIC_THRESHOLD):
+        self.exact = TTLCache(max_size, ttl)
+        self.semantic = SemanticCache(max_size, ttl, threshold)
+        self.query_vectors = TTLCache(max_size, ttl=None)
+        self.generation = None
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def sync(self, generation):
+        """Drop cached answers if the index has changed since they were stored."""
+        if generation != self.generation:
+            with self._lock:
+                if generation != self.generation:
+                    self.exact.clear()
+                    self.semantic.clear()
+                    self.generation = generation
+
+    def embed_query(self, query: str, embed: Callable[[str], List[float]]) -> List[float]:
+        key = normalize_query(query)
+        vector = self.query_vectors.get(key)
+        if vector is None:
+            vector = embed(query)
+            self.query_vectors.put(key, vector)
+        return vector
+
+    async def aembed_query(self, query: str, aembed: Callable[[str], Awaitable[List[float]]]) -> List[float]:
+        key = normalize_query(query)
+        vector = self.query_vectors.get(key)
+        if vector is None:
+            vector = await aembed(query)
+            self.query_vectors.put(key, vector)
+        return vector
+
+    def get_exact(self, query: str) -> Optional[str]:
+        answer = self.exact.get(normalize_query(query))
+        if answer is not None:
+            self.stats["exact_hits"] += 1
+        return answer
+
+    def get_semantic(self, vector: Sequence[float]) -> Optional[str]:
+        answer = self.semantic.get(vector)
+        if answer is not None:
+            self.stats["semantic_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+        return answer
+
+    def put(self, query: str, vector: Optional[Sequence[float]], answer: str, generation=None):
+        if generation is not None and generation != self.generation:
+            # the index changed while this answer was being generated
+            return
+        self.exact.put(normalize_query(query), answer)
+        # answers found without embedding the query (lexical fast path) only go in the exact cache
+        if vector is not None:
+            self.semantic.put(vector, answer)
+
+    def clear(self):
+        self.exact.clear()
+        self.semantic.clear()
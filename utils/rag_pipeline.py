@@ -1,24 +1,396 @@
 import os
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import re
+import json
+import time
+import asyncio
+import pickle
+import threading
+import faiss
+import numpy as np
 from langchain_community.vectorstores import FAISS
-from PyPDF2 import PdfReader
-from models.embeddings import get_gemini_embeddings
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from models.embeddings import get_cached_embeddings
+from utils.embedding_cache import content_hash
+from utils.embedding_engine import EmbeddingEngine
+from utils.query_cache import QueryCache
+from utils.doctor_directory import DoctorDirectory, parse_doctor_records
+from utils.index_factory import DEFAULT_INDEX_TYPE, build_index, is_lossy, needs_rebuild, read_index, reconstruct_all, supports_remove
+from utils.docstore import MmapDocstore, PositionMap, write_docstore
+from utils.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize as lexical_tokenize
+from utils.tracing import record_stage, span, traced
 from models.llm import get_gemini_llm
 
 VECTOR_STORE_PATH = "faiss_index"
+# "hybrid" fuses BM25 and vector results, "vector" is pure similarity search,
+# "lexical" answers from BM25 alone whenever it has hits
+RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid")
+# keyword queries up to this many terms, all known to the BM25 index, skip embedding entirely
+LEXICAL_FAST_PATH_MAX_TERMS = 3
 
-def ingest_pdfs(uploaded_files):
-    texts = []
-    for file in uploaded_files:
-        reader = PdfReader(file)
-        text = "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
-        texts.append(text)
-    all_text = "\n".join(texts)
+DOCSTORE_FILE = "docstore.bin"
+LEGACY_DOCSTORE_FILE = "index.pkl"
+
+def _load_store(path, embeddings, mmap=True):
+    """
+    Load the FAISS store. With mmap the vector index and docstore are mapped read-only and
+    chunks are decoded only when a search returns them; without it (for ingest) the docstore
+    is materialized into a writable InMemoryDocstore.
+    """
+    index = read_index(os.path.join(path, "index.faiss"), mmap=mmap)
+    docstore_path = os.path.join(path, DOCSTORE_FILE)
+    if not os.path.exists(docstore_path) and os.path.exists(os.path.join(path, LEGACY_DOCSTORE_FILE)):
+        # index written before the compact docstore existed; it is converted on the next publish
+        with open(os.path.join(path, LEGACY_DOCSTORE_FILE), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        return FAISS(embeddings, index, docstore, index_to_docstore_id)
+    docstore = MmapDocstore(docstore_path)
+    if mmap:
+        return FAISS(embeddings, index, docstore, PositionMap(len(docstore)))
+    docs = list(docstore)
+    docstore.close()
+    return FAISS(
+        embeddings, index,
+        InMemoryDocstore({doc.id: doc for doc in docs}),
+        {i: doc.id for i, doc in enumerate(docs)},
+    )
+
+def _save_store(db, path):
+    """Write the store via temp files + rename so concurrent readers never see a partial index."""
+    os.makedirs(path, exist_ok=True)
+    docs = (db.docstore.search(db.index_to_docstore_id[i]) for i in range(db.index.ntotal))
+    write_docstore(os.path.join(path, DOCSTORE_FILE), docs)
+    # index.faiss last: its mtime is what tells readers a new index is ready
+    index_path = os.path.join(path, "index.faiss")
+    faiss.write_index(db.index, index_path + ".tmp")
+    os.replace(index_path + ".tmp", index_path)
+    try:
+        os.remove(os.path.join(path, LEGACY_DOCSTORE_FILE))
+    except FileNotFoundError:
+        pass
+
+def _rebuild_index(db, keep_positions=None):
+    """
+    Rebuild db.index as DEFAULT_INDEX_TYPE from its stored vectors, optionally keeping only
+    some positions (used for deletes on index types that can't renumber after remove_ids).
+    """
+    positions = list(range(db.index.ntotal)) if keep_positions is None else keep_positions
+    if is_lossy(db.index):
+        # PQ codes only approximate the vectors; rebuilding from them would compound the error,
+        # so re-embed the chunk texts (served from the embedding cache for indexed chunks)
+        texts = [db.docstore.search(db.index_to_docstore_id[pos]).page_content for pos in positions]
+        vectors = np.asarray(EmbeddingEngine(db.embedding_function).embed(texts), dtype=np.float32)
+    else:
+        vectors = reconstruct_all(db.index)[positions]
+    if keep_positions is not None:
+        db.index_to_docstore_id = {i: db.index_to_docstore_id[pos] for i, pos in enumerate(keep_positions)}
+    db.index = build_index(vectors, DEFAULT_INDEX_TYPE)
+
+def _delete_chunks(db, chunk_ids):
+    if supports_remove(db.index):
+        db.delete(chunk_ids)
+        return
+    doomed = set(chunk_ids)
+    keep = [pos for pos, doc_id in sorted(db.index_to_docstore_id.items()) if doc_id not in doomed]
+    _rebuild_index(db, keep)
+    db.docstore.delete([doc_id for doc_id in chunk_ids if doc_id in db.docstore._dict])
+
+class VectorStoreHolder:
+    """
+    Process-wide holder for the FAISS index and its embeddings client.
+    The index is loaded once and reloaded only when a newer one is written to disk,
+    either by this process (generation bump) or by another one (index file mtime).
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.generation = 0
+        self._lock = threading.Lock()
+        # serializes ingest / remove so read-modify-write of the index never interleaves
+        self.write_lock = threading.Lock()
+        self._db = None
+        self._embeddings = None
+        self._loaded_mtime = None
+
+    def _index_mtime(self):
+        # raises FileNotFoundError when nothing has been ingested yet
+        return os.path.getmtime(os.path.join(self.path, "index.faiss"))
+
+    def embeddings(self):
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    self._embeddings = get_cached_embeddings()
+        return self._embeddings
+
+    def get(self):
+        mtime = self._index_mtime()
+        db = self._db
+        if db is not None and mtime == self._loaded_mtime:
+            return db
+        embeddings = self.embeddings()
+        with self._lock:
+            mtime = self._index_mtime()
+            if self._db is None or mtime != self._loaded_mtime:
+                self._db = _load_store(self.path, embeddings, mmap=True)
+                self._loaded_mtime = mtime
+                self.generation += 1
+            return self._db
+
+    def load_for_update(self):
+        """Load a private, writable copy of the on-disk index (None if there is none yet)."""
+        try:
+            return _load_store(self.path, self.embeddings(), mmap=False)
+        except (FileNotFoundError, RuntimeError):
+            if not os.path.exists(os.path.join(self.path, "index.faiss")):
+                return None
+            raise
+
+    def publish(self, db):
+        """Write a freshly built index to disk and make it the current one."""
+        with self._lock:
+            _save_store(db, self.path)
+            self._db = db
+            self._loaded_mtime = self._index_mtime()
+            self.generation += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._db = None
+            self._loaded_mtime = None
+
+vector_store = VectorStoreHolder(VECTOR_STORE_PATH)
+# answers are tied to vector_store.generation and dropped when the index changes
+answer_cache = QueryCache()
+
+MANIFEST_FILE = "manifest.json"
+
+def _load_manifest():
+    try:
+        with open(os.path.join(VECTOR_STORE_PATH, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"documents": {}}
+
+def _save_manifest(manifest):
+    os.makedirs(VECTOR_STORE_PATH, exist_ok=True)
+    path = os.path.join(VECTOR_STORE_PATH, MANIFEST_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+
+LEXICAL_FILE = "lexical.json"
+
+def _load_lexical_for_update(db):
+    try:
+        return BM25Index.load(os.path.join(VECTOR_STORE_PATH, LEXICAL_FILE))
+    except FileNotFoundError:
+        index = BM25Index()
+        if db is not None:
+            # index was built before lexical search existed: backfill from the docstore
+            index.add_many((doc_id, doc.page_content) for doc_id, doc in db.docstore._dict.items())
+        return index
+
+def _save_lexical(index):
+    os.makedirs(VECTOR_STORE_PATH, exist_ok=True)
+    index.save(os.path.join(VECTOR_STORE_PATH, LEXICAL_FILE))
+
+_lexical_lock = threading.Lock()
+_lexical = (None, BM25Index())
+
+def get_lexical_index() -> BM25Index:
+    """BM25 index for the current vector store, reloaded when ingest rewrites it."""
+    global _lexical
+    try:
+        mtime = os.path.getmtime(os.path.join(VECTOR_STORE_PATH, LEXICAL_FILE))
+    except FileNotFoundError:
+        return BM25Index()
+    if _lexical[0] != mtime:
+        with _lexical_lock:
+            if _lexical[0] != mtime:
+                _lexical = (mtime, BM25Index.load(os.path.join(VECTOR_STORE_PATH, LEXICAL_FILE)))
+    return _lexical[1]
+
+def _chunk_refcounts(manifest):
+    counts = {}
+    for doc in manifest["documents"].values():
+        for chunk_id in doc["chunks"]:
+            counts[chunk_id] = counts.get(chunk_id, 0) + 1
+    return counts
+
+def _drop_document(manifest, doc_id):
+    """Remove a document from the manifest and return the chunk ids no other document uses."""
+    doc = manifest["documents"].pop(doc_id)
+    still_used = _chunk_refcounts(manifest)
+    return [c for c in dict.fromkeys(doc["chunks"]) if c not in still_used]
+
+INGEST_BATCH_SIZE = 256
+
+@traced("rag.ingest")
+def ingest_pdfs(uploaded_files, mode="replace", progress=None):
+    """
+    Index uploaded PDFs.
+    mode="replace" rebuilds the index from just these files.
+    mode="append" upserts them into the existing index: unchanged documents are skipped,
+    a changed document (same name, new content) replaces its old chunks, and only chunks
+    not already in the index are embedded.
+    Pages are extracted in a process pool and streamed through the splitter and the
+    embedding engine in INGEST_BATCH_SIZE chunks, so memory stays flat regardless of
+    upload size. progress(pages_done, total_pages) is called after each batch.
+    Returns a summary dict of what was added/skipped.
+    """
+    if mode not in ("replace", "append"):
+        raise ValueError(f"Unknown ingest mode: {mode}")
+    # ingest-only dependencies; query-only processes never load them
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from utils.pdf_pipeline import SpooledPdf, spool_upload, count_pages, iter_pdf_pages, iter_chunks, batched
     splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-    docs = splitter.create_documents([all_text])
-    embeddings = get_gemini_embeddings()
-    db = FAISS.from_documents(docs, embeddings)
-    db.save_local(VECTOR_STORE_PATH)
+
+    with vector_store.write_lock:
+        if mode == "append":
+            manifest = _load_manifest()
+            db = vector_store.load_for_update()
+            if db is None:
+                manifest = {"documents": {}}
+            lexical = _load_lexical_for_update(db)
+        else:
+            manifest = {"documents": {}}
+            db = None
+            lexical = BM25Index()
+
+        summary = {"documents_added": 0, "documents_skipped": 0, "chunks_added": 0, "chunks_reused": 0, "pages": 0}
+        stale_ids = []
+        added_ids = set()
+        indexed = set(_chunk_refcounts(manifest))
+        spooled = []
+        try:
+            for file in uploaded_files:
+                doc_id, path = spool_upload(file)
+                name = getattr(file, "name", doc_id)
+                if doc_id in manifest["documents"]:
+                    os.remove(path)
+                    summary["documents_skipped"] += 1
+                    continue
+                try:
+                    num_pages = count_pages(path)
+                except Exception:
+                    # not in `spooled` yet, so the finally below wouldn't remove it
+                    os.remove(path)
+                    raise
+                # same file name with new content: upsert replaces the previous version
+                for old_id, old_doc in list(manifest["documents"].items()):
+                    if old_doc["name"] == name:
+                        stale_ids.extend(_drop_document(manifest, old_id))
+                manifest["documents"][doc_id] = {"name": name, "chunks": []}
+                spooled.append(SpooledPdf(name, doc_id, path, num_pages))
+                summary["documents_added"] += 1
+
+            total_pages = sum(p.num_pages for p in spooled)
+
+            def counted(pages):
+                for page in pages:
+                    summary["pages"] += 1
+                    # doctor records are parsed once here so doctor search can skip the LLM
+                    doctors = parse_doctor_records(page.text)
+                    if doctors:
+                        manifest["documents"][page.doc_id].setdefault("doctors", []).extend(doctors)
+                    yield page
+
+            embeddings = vector_store.embeddings()
+            engine = EmbeddingEngine(embeddings)
+            for batch in batched(iter_chunks(counted(iter_pdf_pages(spooled)), splitter), INGEST_BATCH_SIZE):
+                texts, metadatas, ids = [], [], []
+                for text, metadata in batch:
+                    chunk_id = content_hash(text)
+                    manifest["documents"][metadata["doc_id"]]["chunks"].append(chunk_id)
+                    if chunk_id in indexed:
+                        summary["chunks_reused"] += 1
+                        continue
+                    indexed.add(chunk_id)
+                    texts.append(text)
+                    metadatas.append(metadata)
+                    ids.append(chunk_id)
+                if ids:
+                    text_embeddings = list(zip(texts, engine.embed(texts)))
+                    if db is None:
+                        db = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas, ids=ids)
+                    else:
+                        db.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+                    lexical.add_many(zip(ids, texts))
+                    added_ids.update(ids)
+                if progress and total_pages:
+                    progress(min(summary["pages"], total_pages), total_pages)
+        finally:
+            for pdf in spooled:
+                try:
+                    os.remove(pdf.path)
+                except OSError:
+                    pass
+
+        # a stale chunk that reappears in the new version must stay in the index
+        live_ids = added_ids | set(_chunk_refcounts(manifest))
+        stale_ids = [c for c in stale_ids if c not in live_ids]
+        if not added_ids and not stale_ids:
+            if db is None:
+                # nothing new to index and no existing store to keep (always the case in replace
+                # mode): saving the manifest would orphan whatever index is still on disk
+                raise ValueError("No text could be extracted from the uploaded PDFs.")
+            if summary["documents_added"]:
+                _save_manifest(manifest)
+            return summary
+
+        if stale_ids and db is not None:
+            _delete_chunks(db, stale_ids)
+            lexical.remove(stale_ids)
+        if needs_rebuild(db.index):
+            # new stores start flat; switch to the configured type, and retrain IVF once the
+            # corpus has outgrown the nlist it was sized for
+            _rebuild_index(db)
+        summary["chunks_added"] = len(added_ids)
+        # lexical index first, so a reader that sees the new vector index also sees it
+        _save_lexical(lexical)
+        vector_store.publish(db)
+        _save_manifest(manifest)
+        return summary
+
+def list_indexed_documents():
+    """Return [{"doc_id", "name", "chunks"}] for every document in the index."""
+    return [
+        {"doc_id": doc_id, "name": doc["name"], "chunks": len(doc["chunks"])}
+        for doc_id, doc in _load_manifest()["documents"].items()
+    ]
+
+def remove_document(doc_id_or_name):
+    """Remove a document (by content hash or file name) and any chunks only it referenced."""
+    with vector_store.write_lock:
+        manifest = _load_manifest()
+        matches = [
+            doc_id for doc_id, doc in manifest["documents"].items()
+            if doc_id == doc_id_or_name or doc["name"] == doc_id_or_name
+        ]
+        if not matches:
+            return False
+        stale_ids = []
+        for doc_id in matches:
+            stale_ids.extend(_drop_document(manifest, doc_id))
+        stale_ids = [c for c in stale_ids if c not in _chunk_refcounts(manifest)]
+        db = vector_store.load_for_update()
+        if db is not None and stale_ids:
+            if manifest["documents"]:
+                _delete_chunks(db, stale_ids)
+                lexical = _load_lexical_for_update(db)
+                lexical.remove(stale_ids)
+                _save_lexical(lexical)
+                vector_store.publish(db)
+            else:
+                # FAISS cannot persist an empty index usefully; drop it entirely
+                for fname in ("index.faiss", DOCSTORE_FILE, LEGACY_DOCSTORE_FILE, LEXICAL_FILE):
+                    try:
+                        os.remove(os.path.join(VECTOR_STORE_PATH, fname))
+                    except FileNotFoundError:
+                        pass
+                vector_store.invalidate()
+        _save_manifest(manifest)
+        return True
 
 def _extract_text_from_response(response):
     """Robustly extract plain text from various Gemini/LC response shapes."""
@@ -45,43 +417,251 @@ def _extract_text_from_response(response):
     # Fallback
     return str(response)
 
-def answer_query_with_rag(query):
-    # Return synthesized answer using LLM; handle missing index gracefully
+def _rag_start(query):
+    """
+    First step of the RAG answer paths: open the index and check the exact cache.
+    Returns (answer, None) when the answer is already known (cache hit or error message),
+    else (None, (db, generation)).
+    """
+    # handle missing index gracefully
     try:
-        embeddings = get_gemini_embeddings()
-        db = FAISS.load_local(VECTOR_STORE_PATH, embeddings, allow_dangerous_deserialization=True)
+        with span("rag.index_load"):
+            db = vector_store.get()
     except FileNotFoundError:
-        return "No documents indexed yet. Please upload PDFs on the 'Upload PDFs' page."
+        return "No documents indexed yet. Please upload PDFs on the 'Upload PDFs' page.", None
     except RuntimeError as e:
-        return str(e)
+        return str(e), None
     except Exception as e:
-        return f"Failed to load vector store or embeddings: {e}"
+        return f"Failed to load vector store or embeddings: {e}", None
 
-    docs = db.similarity_search(query, k=3)
-    context = "\n".join([doc.page_content for doc in docs])
+    generation = vector_store.generation
+    with span("rag.cache_lookup"):
+        answer_cache.sync(generation)
+        cached = answer_cache.get_exact(query)
+    if cached is not None:
+        return cached, None
+    return None, (db, generation)
 
-    llm = get_gemini_llm()
-    prompt = (
+def _docs_by_ids(db, ids):
+    docs = (db.docstore.search(chunk_id) for chunk_id in ids)
+    # the docstore returns an error string for unknown ids
+    return [doc for doc in docs if not isinstance(doc, str)]
+
+@traced("rag.lexical_search")
+def lexical_fast_path(db, query, k):
+    """
+    Documents for a short keyword query (doctor name, specialization...) straight from
+    BM25, or None when the query should go through embedding + vector search.
+    """
+    if RETRIEVAL_MODE == "vector":
+        return None
+    lexical = get_lexical_index()
+    terms = lexical_tokenize(query)
+    if not terms:
+        return None
+    if RETRIEVAL_MODE != "lexical":
+        if len(terms) > LEXICAL_FAST_PATH_MAX_TERMS or not all(t in lexical.postings for t in terms):
+            return None
+    hits = lexical.search(query, k)
+    return _docs_by_ids(db, [chunk_id for chunk_id, _ in hits]) or None
+
+@traced("rag.retrieve")
+def retrieve(db, query, query_vector, k):
+    """Vector search, fused with BM25 results by reciprocal rank fusion in hybrid mode."""
+    if RETRIEVAL_MODE == "vector":
+        return db.similarity_search_by_vector(query_vector, k=k)
+    vector_docs = db.similarity_search_by_vector(query_vector, k=2 * k)
+    lexical_ids = [chunk_id for chunk_id, _ in get_lexical_index().search(query, 2 * k)]
+    if not lexical_ids:
+        return vector_docs[:k]
+    by_id = {doc.id: doc for doc in vector_docs}
+    fused = reciprocal_rank_fusion([[doc.id for doc in vector_docs], lexical_ids])[:k]
+    missing = [chunk_id for chunk_id in fused if chunk_id not in by_id]
+    by_id.update((doc.id, doc) for doc in _docs_by_ids(db, missing))
+    return [by_id[chunk_id] for chunk_id in fused if chunk_id in by_id]
+
+def _build_rag_prompt(query, docs):
+    context = "\n".join([doc.page_content for doc in docs])
+    return (
         f"Use the following context from documents to answer the question concisely.\n\nContext:\n{context}\n\n"
         f"Question: {query}\nAnswer briefly and only using the context. If not found, reply: 'Not found in documents.'"
     )
-    response = llm.invoke(prompt)
-    answer = _extract_text_from_response(response)
+
+def _rag_prompt(db, query, query_vector):
+    """Second step, once the query is embedded: semantic cache, then retrieval. Returns (answer, prompt)."""
+    cached = answer_cache.get_semantic(query_vector)
+    if cached is not None:
+        return cached, None
+    return None, _build_rag_prompt(query, retrieve(db, query, query_vector, k=3))
+
+def _prepare_rag(query):
+    """
+    Shared front half of the sync RAG answer paths.
+    Returns (answer, None) when the answer is already known,
+    else (None, (prompt, query_vector, generation)) for the caller to send to the LLM.
+    """
+    answer, state = _rag_start(query)
+    if state is None:
+        return answer, None
+    db, generation = state
+    docs = lexical_fast_path(db, query, k=3)
+    if docs:
+        return None, (_build_rag_prompt(query, docs), None, generation)
+    with span("rag.embed_query"):
+        query_vector = answer_cache.embed_query(query, vector_store.embeddings().embed_query)
+    answer, prompt = _rag_prompt(db, query, query_vector)
+    if prompt is None:
+        return answer, None
+    return None, (prompt, query_vector, generation)
+
+def _clean_answer(answer):
     # Ensure final return is a string and safe for .strip()
     return answer.strip() if isinstance(answer, str) else str(answer)
 
+@traced("rag.answer", request=True)
+def answer_query_with_rag(query):
+    # Return synthesized answer using LLM
+    answer, pending = _prepare_rag(query)
+    if pending is None:
+        return answer
+    prompt, query_vector, generation = pending
+
+    llm = get_gemini_llm()
+    with span("rag.llm"):
+        response = llm.invoke(prompt)
+    answer = _clean_answer(_extract_text_from_response(response))
+    answer_cache.put(query, query_vector, answer, generation)
+    return answer
+
+@traced("rag.answer", request=True)
+async def aanswer_query_with_rag(query):
+    """Async variant of answer_query_with_rag; network calls are awaited instead of blocking."""
+    # the first load of the index reads from disk, so keep it off the event loop
+    answer, state = await asyncio.to_thread(_rag_start, query)
+    if state is None:
+        return answer
+    db, generation = state
+    query_vector = None
+    docs = lexical_fast_path(db, query, k=3)
+    if docs:
+        prompt = _build_rag_prompt(query, docs)
+    else:
+        with span("rag.embed_query"):
+            query_vector = await answer_cache.aembed_query(query, vector_store.embeddings().aembed_query)
+        answer, prompt = _rag_prompt(db, query, query_vector)
+        if prompt is None:
+            return answer
+
+    llm = get_gemini_llm()
+    with span("rag.llm"):
+        response = await llm.ainvoke(prompt)
+    answer = _clean_answer(_extract_text_from_response(response))
+    answer_cache.put(query, query_vector, answer, generation)
+    return answer
+
+def stream_answer_query_with_rag(query):
+    """
+    Streaming variant of answer_query_with_rag: yields answer text pieces as Gemini
+    produces them. Cached answers and error messages are yielded in one piece.
+    """
+    answer, pending = _prepare_rag(query)
+    if pending is None:
+        yield answer
+        return
+    prompt, query_vector, generation = pending
+
+    llm = get_gemini_llm()
+    parts = []
+    # only time to first token is recorded: the rest of the stream is paced by
+    # the caller rendering each piece
+    start = time.perf_counter()
+    for chunk in llm.stream(prompt):
+        if start is not None:
+            record_stage("rag.llm_first_token", time.perf_counter() - start)
+            start = None
+        text = _extract_text_from_response(chunk)
+        if not parts:
+            text = text.lstrip()
+        if text:
+            parts.append(text)
+            yield text
+    answer = "".join(parts).strip()
+    if not answer:
+        # nothing streamed back; keep the same fallback the chat page shows
+        answer = "Not found in documents."
+        yield answer
+    answer_cache.put(query, query_vector, answer, generation)
+
+_directory_lock = threading.Lock()
+_directory = (None, DoctorDirectory())
+
+def get_doctor_directory() -> DoctorDirectory:
+    """Doctor directory built from the ingest manifest, rebuilt when the manifest changes."""
+    global _directory
+    try:
+        mtime = os.path.getmtime(os.path.join(VECTOR_STORE_PATH, MANIFEST_FILE))
+    except FileNotFoundError:
+        return DoctorDirectory()
+    if _directory[0] != mtime:
+        with _directory_lock:
+            if _directory[0] != mtime:
+                records = [d for doc in _load_manifest()["documents"].values() for d in doc.get("doctors", [])]
+                _directory = (mtime, DoctorDirectory(records))
+    return _directory[1]
+
+@traced("doctors.search", request=True)
 def find_doctor_suggestions(query):
     """
-    Given symptom / intent text, retrieve context and ask Gemini to extract structured doctor suggestions:
-    returns list of dicts with keys: name, specialization, experience_years, fee, available_times (list)
+    Given symptom / intent text, return structured doctor suggestions:
+    list of dicts with keys: name, specialization, experience_years, fee, available_times (list).
+    Answered from the ingest-time doctor directory when it can; only queries the
+    directory can't resolve (e.g. unfamiliar symptoms) go to retrieval + Gemini.
     """
-    embeddings = get_gemini_embeddings()
-    db = FAISS.load_local(VECTOR_STORE_PATH, embeddings, allow_dangerous_deserialization=True)
-    docs = db.similarity_search(query, k=4)
+    with span("doctors.directory"):
+        directory = get_doctor_directory()
+        matches = directory.search(query) if len(directory) else None
+    if matches is not None:
+        return matches
+
+    with span("rag.index_load"):
+        db = vector_store.get()
+    docs = lexical_fast_path(db, query, k=4)
+    if not docs:
+        with span("rag.embed_query"):
+            query_vector = vector_store.embeddings().embed_query(query)
+        docs = retrieve(db, query, query_vector, k=4)
     context = "\n".join([doc.page_content for doc in docs])
 
     llm = get_gemini_llm()
-    prompt = (
+    with span("rag.llm"):
+        response = llm.invoke(_doctor_prompt(context, query))
+    return _parse_doctor_suggestions(_extract_text_from_response(response))
+
+@traced("doctors.search", request=True)
+async def afind_doctor_suggestions(query):
+    """Async variant of find_doctor_suggestions."""
+    with span("doctors.directory"):
+        directory = get_doctor_directory()
+        matches = directory.search(query) if len(directory) else None
+    if matches is not None:
+        return matches
+
+    with span("rag.index_load"):
+        db = await asyncio.to_thread(vector_store.get)
+    docs = lexical_fast_path(db, query, k=4)
+    if not docs:
+        with span("rag.embed_query"):
+            query_vector = await vector_store.embeddings().aembed_query(query)
+        docs = retrieve(db, query, query_vector, k=4)
+    context = "\n".join([doc.page_content for doc in docs])
+
+    llm = get_gemini_llm()
+    with span("rag.llm"):
+        response = await llm.ainvoke(_doctor_prompt(context, query))
+    return _parse_doctor_suggestions(_extract_text_from_response(response))
+
+def _doctor_prompt(context, query):
+    return (
         "You are given medical directory content. Extract up to 3 matching doctors for the user's symptom.\n"
         "For each doctor provide JSON object with fields: name, specialization, experience_years (int), "
         "fee (string), available_times (list of HH:MM strings). "
@@ -90,10 +670,8 @@ def find_doctor_suggestions(query):
         f"User symptom/query: {query}\n\n"
         "Return JSON array."
     )
-    response = llm.invoke(prompt)
-    raw = _extract_text_from_response(response)
 
-    import json, re
+def _parse_doctor_suggestions(raw):
     # Ensure we always pass a string into re.search
     raw_str = str(raw)
     m = re.search(r'(\[.*\])', raw_str, re.S)
@@ -0,0 +1,191 @@
+# utils/tracing.py
+"""
+Lightweight per-stage latency tracing.
+
+span("rag.llm") / @traced("rag.llm") time a stage into an in-process histogram and,
+when a request trace is active, into that trace's breakdown. trace() opens the
+per-request trace (one trace id per chat turn / API call, carried in a contextvar
+so it follows asyncio tasks and asyncio.to_thread). Requests slower than
+TRACE_SLOW_REQUEST_MS are logged with their stage breakdown, and
+render_prometheus() exposes the histograms in Prometheus text format.
+"""
+import os
+import time
+import uuid
+import bisect
+import inspect
+import logging
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+SLOW_REQUEST_MS = float(os.getenv("TRACE_SLOW_REQUEST_MS", "0"))  # 0 disables the slow log
+# seconds; spans from sub-millisecond cache lookups up to multi-second LLM calls
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+logger = logging.getLogger(__name__)
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, error: bool = False):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += seconds
+            self.count += 1
+            if error:
+                self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count, self.errors
+
+class Trace:
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.name = name
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.start = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+        self.duration: Optional[float] = None
+
+    def breakdown(self) -> Dict[str, float]:
+        """Total seconds per stage name (a stage can run several times in one request)."""
+        totals: Dict[str, float] = {}
+        for stage, seconds in self.stages:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        return totals
+
+_current: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+_stage_histograms: Dict[str, Histogram] = {}
+_request_histograms: Dict[str, Histogram] = {}
+_registry_lock = threading.Lock()
+
+def _histogram(registry: Dict[str, Histogram], name: str) -> Histogram:
+    hist = registry.get(name)
+    if hist is None:
+        with _registry_lock:
+            hist = registry.setdefault(name, Histogram())
+    return hist
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+def current_trace_id() -> Optional[str]:
+    t = _current.get()
+    return t.trace_id if t else None
+
+def record_stage(stage: str, seconds: float, error: bool = False):
+    _histogram(_stage_histograms, stage).observe(seconds, error)
+    t = _current.get()
+    if t is not None:
+        t.stages.append((stage, seconds))
+
+@contextmanager
+def span(stage: str):
+    """Time the enclosed block as one run of ``stage``."""
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - start, error)
+
+def traced(stage: str, request: bool = False):
+    """
+    Decorator form of span() for plain and async functions. With request=True the
+    call opens a request trace when none is active (entry points like the RAG answer).
+    """
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with (trace(stage) if request else span(stage)):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with (trace(stage) if request else span(stage)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def start_trace(name: str, trace_id: Optional[str] = None):
+    """Begin a request trace; returns (trace, token) for finish_trace()."""
+    t = Trace(name, trace_id)
+    return t, _current.set(t)
+
+def finish_trace(t: Trace, token=None, error: bool = False) -> Trace:
+    t.duration = time.perf_counter() - t.start
+    if token is not None:
+        _current.reset(token)
+    _histogram(_request_histograms, t.name).observe(t.duration, error)
+    if SLOW_REQUEST_MS and t.duration * 1000 >= SLOW_REQUEST_MS:
+        stages = ", ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in t.breakdown().items())
+        logger.warning("slow request %s trace=%s %.1fms: %s", t.name, t.trace_id, t.duration * 1000, stages or "no stages")
+    return t
+
+@contextmanager
+def trace(name: str, trace_id: Optional[str] = None):
+    """
+    Request-level trace. Nested inside an existing trace (e.g. the RAG entry point
+    called from an API request) it only records a span, so one request = one trace.
+    """
+    if _current.get() is not None:
+        with span(name):
+            yield _current.get()
+        return
+    t, token = start_trace(name, trace_id)
+    error = False
+    try:
+        yield t
+    except BaseException:
+        error = True
+        raise
+    finally:
+        finish_trace(t, token, error)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _render_family(lines: List[str], metric: str, label: str, registry: Dict[str, Histogram], help_text: str):
+    lines.append(f"# HELP {metric} {help_text}")
+    lines.append(f"# TYPE {metric} histogram")
+    for name in sorted(registry):
+        counts, total, count, _ = registry[name].snapshot()
+        key = f'{label}="{_escape(name)}"'
+        cumulative = 0
+        for bound, n in zip(registry[name].buckets, counts):
+            cumulative += n
+            lines.append(f'{metric}_bucket{{{key},le="{bound:g}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{{key},le="+Inf"}} {count}')
+        lines.append(f"{metric}_sum{{{key}}} {total:.6f}")
+        lines.append(f"{metric}_count{{{key}}} {count}")
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    _render_family(lines, "stage_duration_seconds", "stage", _stage_histograms, "Time spent in each traced stage.")
+    lines.append("# HELP stage_errors_total Traced stage runs that raised.")
+    lines.append("# TYPE stage_errors_total counter")
+    for name in sorted(_stage_histograms):
+        lines.append(f'stage_errors_total{{stage="{_escape(name)}"}} {_stage_histograms[name].snapshot()[3]}')
+    _render_family(lines, "request_duration_seconds", "request", _request_histograms, "End-to-end request latency.")
+    return "\n".join(lines) + "\n"
+
+def reset_metrics():
+    with _registry_lock:
+        _stage_histograms.clear()
+        _request_histograms.clear()
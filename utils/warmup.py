@@ -0,0 +1,65 @@
+# utils/warmup.py
+"""
+Optional background warm-up for the lazily initialized pieces: the RAG stack and
+FAISS index, the embeddings and Gemini clients, the Supabase client and the email
+session. Enabled with WARMUP_ON_START=1 so the first user request doesn't pay for
+them; without it everything still loads on first use.
+"""
+import os
+import threading
+from utils.tracing import span
+
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "0").lower() in ("1", "true", "yes")
+
+_thread = None
+_lock = threading.Lock()
+
+def _load_rag():
+    import utils.rag_pipeline as rp
+    rp.vector_store.embeddings()
+    try:
+        rp.vector_store.get()
+    except FileNotFoundError:
+        return  # nothing ingested yet
+    rp.get_lexical_index()
+    rp.get_doctor_directory()
+
+def _load_llm():
+    from models.llm import get_gemini_llm
+    get_gemini_llm()
+
+def _load_supabase():
+    from db.supabase_client import get_supabase
+    get_supabase()
+
+def _load_email():
+    from tools.email_tool import get_email_session
+    get_email_session()
+
+STEPS = (("rag", _load_rag), ("llm", _load_llm), ("supabase", _load_supabase), ("email", _load_email))
+
+def _run():
+    for name, step in STEPS:
+        try:
+            with span(f"warmup.{name}"):
+                step()
+        except Exception as e:
+            # warm-up is best effort; the real request will surface the error
+            print(f"Warm-up step {name} failed:", e)
+
+def warm_up(background: bool = True):
+    """Preload heavy clients once per process. Returns the warm-up thread (None when run inline)."""
+    global _thread
+    if not background:
+        _run()
+        return None
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name="warm-up", daemon=True)
+            _thread.start()
+    return _thread
+
+def warm_up_if_enabled():
+    if WARMUP_ON_START:
+        return warm_up()
+    return None